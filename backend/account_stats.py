@@ -0,0 +1,263 @@
+"""
+Running Account Statistics for Financial Advisor Platform
+
+This module keeps per-account aggregates of the performance history (return
+count and sum, Welford mean/M2 for volatility, peak value and worst drawdown)
+in the account_stats table. Import paths fold newly inserted rows into the
+stored aggregates, so reading them is a primary key lookup.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from sqlalchemy import select, bindparam
+
+from app import db
+from models import AccountStats, Performance
+from queries import load_performance_df
+
+# Number of accounts whose history is loaded at once during a rebuild
+REBUILD_BATCH_SIZE = 500
+
+STATS_COLUMNS = ['return_count', 'return_sum', 'return_mean', 'return_m2', 'value_count',
+                 'peak_value', 'max_drawdown', 'last_value_date', 'latest_allocation_date']
+
+
+def compute_account_stats(performance_df, prior=None):
+    """
+    Aggregate performance rows per account, optionally continuing from stored aggregates
+
+    Args:
+        performance_df: DataFrame of performance rows with an 'account_id' column
+        prior: DataFrame of stored aggregates indexed by account_id (optional);
+            value rows must not predate an account's last_value_date
+
+    Returns:
+        DataFrame of STATS_COLUMNS indexed by account_id
+    """
+    df = performance_df.dropna(subset=['account_id', 'date']).copy()
+    df['account_id'] = df['account_id'].astype('int64')
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values(['account_id', 'date'], kind='mergesort')
+    account_ids = pd.Index(df['account_id'].unique(), name='account_id')
+    stats = pd.DataFrame(index=account_ids)
+
+    # Welford aggregates of the returns in this batch
+    returns = pd.to_numeric(df['return_pct'], errors='coerce') if 'return_pct' in df.columns else pd.Series(dtype='float64')
+    returns = returns.dropna()
+    by_account = returns.groupby(df.loc[returns.index, 'account_id'])
+    count = by_account.count().reindex(account_ids, fill_value=0)
+    mean = by_account.mean().reindex(account_ids).fillna(0.0)
+    m2 = (by_account.var(ddof=0) * by_account.count()).reindex(account_ids).fillna(0.0)
+    total = by_account.sum().reindex(account_ids, fill_value=0.0)
+
+    # Running maximum and drawdown of the values, seeded with the stored peak
+    values = pd.to_numeric(df['value'], errors='coerce') if 'value' in df.columns else pd.Series(dtype='float64')
+    values = values.dropna()
+    value_accounts = df.loc[values.index, 'account_id']
+    running_max = values.groupby(value_accounts).cummax()
+    prior_peak = None
+    if prior is not None and not prior.empty:
+        prior_peak = value_accounts.map(prior['peak_value']).astype('float64')
+        running_max = np.fmax(running_max, prior_peak)
+    drawdown = ((values - running_max) / running_max).groupby(value_accounts)
+
+    stats['return_count'] = count
+    stats['return_sum'] = total
+    stats['return_mean'] = mean
+    stats['return_m2'] = m2
+    stats['value_count'] = values.groupby(value_accounts).count().reindex(account_ids, fill_value=0)
+    stats['peak_value'] = running_max.groupby(value_accounts).max().reindex(account_ids)
+    stats['max_drawdown'] = drawdown.min().reindex(account_ids).fillna(0.0)
+    stats['last_value_date'] = df.loc[values.index, 'date'].groupby(value_accounts).max().reindex(account_ids)
+
+    if 'asset_type' in df.columns and 'allocation_pct' in df.columns:
+        alloc = df.dropna(subset=['asset_type', 'allocation_pct'])
+        stats['latest_allocation_date'] = alloc.groupby('account_id')['date'].max().reindex(account_ids)
+    else:
+        stats['latest_allocation_date'] = pd.NaT
+
+    if prior is None or prior.empty:
+        return stats
+
+    # Merge with the stored aggregates (Chan et al. parallel variance update)
+    old = prior.reindex(account_ids)
+    known = old['return_count'].notna()
+    old_count = old['return_count'].fillna(0)
+    old_mean = old['return_mean'].fillna(0.0)
+    merged_count = old_count + stats['return_count']
+    delta = stats['return_mean'] - old_mean
+    share = (stats['return_count'] / merged_count.where(merged_count > 0)).fillna(0.0)
+
+    merged = stats.copy()
+    merged['return_count'] = merged_count
+    merged['return_sum'] = old['return_sum'].fillna(0.0) + stats['return_sum']
+    merged['return_mean'] = old_mean + delta * share
+    merged['return_m2'] = old['return_m2'].fillna(0.0) + stats['return_m2'] + delta * delta * old_count * share
+    merged['value_count'] = old['value_count'].fillna(0) + stats['value_count']
+    merged['peak_value'] = np.fmax(old['peak_value'], stats['peak_value'])
+    merged['max_drawdown'] = np.fmin(old['max_drawdown'], stats['max_drawdown'])
+    merged['last_value_date'] = stats['last_value_date'].where(stats['last_value_date'].notna(), old['last_value_date'])
+    merged['latest_allocation_date'] = pd.concat(
+        [old['latest_allocation_date'], stats['latest_allocation_date']], axis=1).max(axis=1)
+
+    # Without stored aggregates the batch stands alone
+    return merged.where(known, stats)
+
+
+def fetch_account_stats(account_ids):
+    """
+    Load the stored aggregates of a set of accounts with a single query
+
+    Args:
+        account_ids: Iterable of account IDs
+
+    Returns:
+        DataFrame of STATS_COLUMNS indexed by account_id
+    """
+    table = AccountStats.__table__
+    stmt = select(table.c.account_id, *[table.c[column] for column in STATS_COLUMNS]) \
+        .where(table.c.account_id.in_([int(account_id) for account_id in account_ids]))
+    rows = db.session.execute(stmt).all()
+    stats = pd.DataFrame.from_records(rows, columns=['account_id'] + STATS_COLUMNS).set_index('account_id')
+    for column in ('last_value_date', 'latest_allocation_date'):
+        stats[column] = pd.to_datetime(stats[column])
+    return stats
+
+
+def _stats_records(stats):
+    """Turn a stats DataFrame into a list of dicts with plain Python values"""
+    now = datetime.utcnow()
+    records = []
+    for account_id, row in stats.iterrows():
+        record = {'account_id': int(account_id), 'updated_at': now}
+        for column in STATS_COLUMNS:
+            value = row[column]
+            if pd.isna(value):
+                value = None
+            elif isinstance(value, pd.Timestamp):
+                value = value.to_pydatetime()
+            elif column in ('return_count', 'value_count'):
+                value = int(value)
+            else:
+                value = float(value)
+            record[column] = value
+        records.append(record)
+    return records
+
+
+def save_account_stats(stats, existing_ids=()):
+    """
+    Write aggregates to the account_stats table
+
+    Args:
+        stats: DataFrame of STATS_COLUMNS indexed by account_id
+        existing_ids: Account IDs that already have a stored row and are updated in place
+    """
+    if stats.empty:
+        return
+
+    table = AccountStats.__table__
+    existing_ids = set(existing_ids)
+    records = _stats_records(stats)
+    updates = [record for record in records if record['account_id'] in existing_ids]
+    inserts = [record for record in records if record['account_id'] not in existing_ids]
+
+    if updates:
+        stmt = table.update() \
+            .where(table.c.account_id == bindparam('_account_id')) \
+            .values({column: bindparam(column) for column in STATS_COLUMNS + ['updated_at']})
+        db.session.execute(stmt, [
+            dict({column: record[column] for column in STATS_COLUMNS + ['updated_at']}, _account_id=record['account_id'])
+            for record in updates
+        ])
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+
+
+def rebuild_account_stats(account_ids=None, batch_size=REBUILD_BATCH_SIZE):
+    """
+    Recompute aggregates from the full performance history
+
+    Args:
+        account_ids: Iterable of account IDs (optional, defaults to every
+            account with performance rows)
+        batch_size: Number of accounts loaded at once
+
+    Returns:
+        Number of accounts rebuilt
+    """
+    table = AccountStats.__table__
+    if account_ids is None:
+        db.session.execute(table.delete())
+        account_ids = db.session.execute(select(Performance.account_id).distinct()).scalars().all()
+    account_ids = sorted({int(account_id) for account_id in account_ids})
+
+    for start in range(0, len(account_ids), batch_size):
+        batch = account_ids[start:start + batch_size]
+        db.session.execute(table.delete().where(table.c.account_id.in_(batch)))
+        save_account_stats(compute_account_stats(load_performance_df(batch)))
+    return len(account_ids)
+
+
+def update_account_stats(inserted_df, stale_account_ids=None):
+    """
+    Fold newly inserted performance rows into the stored aggregates
+
+    Accounts without stored aggregates, accounts receiving values older than
+    their last stored value (drawdown depends on order) and accounts listed
+    as stale are rebuilt from the database instead. Call this after the rows
+    are written, inside the same transaction.
+
+    Args:
+        inserted_df: DataFrame of the inserted performance rows
+        stale_account_ids: Account IDs whose existing rows were modified (optional)
+    """
+    rebuild = set(int(account_id) for account_id in stale_account_ids) if stale_account_ids is not None else set()
+    if inserted_df.empty and not rebuild:
+        return
+
+    inserted_df = inserted_df.dropna(subset=['account_id', 'date'])
+    account_ids = set(inserted_df['account_id'].astype('int64').unique()) - rebuild
+    prior = fetch_account_stats(account_ids) if account_ids else pd.DataFrame(columns=STATS_COLUMNS)
+
+    # Accounts that cannot be extended incrementally
+    rebuild |= account_ids - set(prior.index)
+    if 'value' in inserted_df.columns and not prior.empty:
+        value_rows = inserted_df[inserted_df['value'].notna()]
+        first_value = pd.to_datetime(value_rows['date']).groupby(value_rows['account_id'].astype('int64')).min()
+        last_stored = prior['last_value_date'].reindex(first_value.index)
+        rebuild |= set(first_value.index[(first_value < last_stored).to_numpy()])
+
+    incremental = inserted_df[inserted_df['account_id'].astype('int64').isin(account_ids - rebuild)]
+    if not incremental.empty:
+        save_account_stats(compute_account_stats(incremental, prior), existing_ids=prior.index)
+    if rebuild:
+        rebuild_account_stats(rebuild)
+
+
+def get_account_stats(account_id):
+    """Return the stored AccountStats of an account, or None"""
+    return db.session.get(AccountStats, account_id)
+
+
+def apply_running_stats(metrics, account_id):
+    """
+    Take volatility and max drawdown of a metrics dictionary from account_stats
+
+    Both cover the account's whole history, so the running aggregates answer
+    them without the performance rows; the period returns are left as they are.
+
+    Args:
+        metrics: Metrics dictionary as process_account_performance returns it
+        account_id: Account ID
+
+    Returns:
+        Copy of the metrics with the stored aggregates, or the metrics
+        unchanged if the account has no stats row
+    """
+    stats = get_account_stats(account_id)
+    if stats is None:
+        return metrics
+    stats = stats.to_dict()
+    return dict(metrics, volatility=stats['volatility'], max_drawdown=stats['max_drawdown'])
@@ -1,9 +1,14 @@
-from flask import Flask, request, jsonify, send_file, render_template, send_from_directory
+from flask import (Flask, request, jsonify, send_file, render_template, send_from_directory, after_this_request,
+                   stream_with_context)
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 import os
-import pandas as pd
-from datetime import datetime
+import json
+import click
+import uuid
+import tempfile
+from functools import partial
+from datetime import datetime, timedelta
 import dateutil.parser
 
 # Initialize Flask app
@@ -12,10 +17,25 @@ app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:/
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 db = SQLAlchemy(app)
 
-from excel_handler import read_excel_file, write_excel_file
-from data_processor import process_client_data, process_account_performance
+from excel_handler import write_excel_file
+from data_processor import process_client_data, process_performance_batch, process_household_performance, RETURN_PERIODS
 from main import app, db
 from models import Household, Account, Activity, Performance, FinancialGoal, GoalProgressUpdate
+from import_engine import (run_excel_import, run_csv_import, run_parquet_import, table_for_sheet, ImportDataError,
+                           stream_digest, find_imported_file, remember_import, DELTA_TARGET_SUFFIX)
+from import_jobs import submit_import_job, get_import_job
+from queries import load_performance_df, load_client_summary, page_households, page_activities, MAX_PAGE_SIZE
+from projections import project_goal, DEFAULT_PROJECTION_PATHS, DEFAULT_PROJECTION_SEED
+from metrics_cache import get_return_index, get_account_metrics, get_account_chart_data, cache_stats
+from account_stats import get_account_stats, rebuild_account_stats, apply_running_stats
+from metrics_snapshots import (get_metrics_snapshots, latest_account_metrics, refresh_account_metrics,
+                               refresh_after_import, schedule_metrics_refresh, start_metrics_scheduler)
+from export_engine import resolve_export_tables, stream_csv, stream_ndjson, export_xlsx, export_parquet
+from query_plans import check_query_plans
+from serializers import json_response, load_records, to_records
+from http_cache import table_state, resource_validators, conditional_response
+from household_snapshots import (load_household_snapshots, RECENT_ACTIVITY_COUNT, MAX_RECENT_ACTIVITIES,
+                                 MAX_SNAPSHOT_HOUSEHOLDS)
 
 CORS(app)
 
@@ -24,6 +44,89 @@ UPLOAD_FOLDER = 'uploads'
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
+def request_flag(name):
+    """Return True if a query string or form parameter is set to a truthy value"""
+    return str(request.values.get(name, '')).lower() in ('1', 'true', 'yes')
+
+def request_page_size():
+    """
+    Return the 'limit' query parameter of a paginated list endpoint
+    
+    Returns:
+        Page size, or None when the parameter is absent (no pagination)
+        
+    Raises:
+        ValueError: If the limit is not an integer between 1 and MAX_PAGE_SIZE
+    """
+    limit = request.args.get('limit')
+    if limit is None:
+        return None
+    limit = int(limit)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+def paginated_response(items, next_cursor):
+    """JSON list response with the next page's cursor in the X-Next-Cursor header"""
+    response = json_response(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+def request_recent_activities():
+    """
+    Return the 'activities' query parameter of a snapshot endpoint
+    
+    Returns:
+        Number of recent activities per account (RECENT_ACTIVITY_COUNT when absent)
+        
+    Raises:
+        ValueError: If the number is not an integer between 0 and MAX_RECENT_ACTIVITIES
+    """
+    count = int(request.args.get('activities', RECENT_ACTIVITY_COUNT))
+    if not 0 <= count <= MAX_RECENT_ACTIVITIES:
+        raise ValueError(f"activities must be between 0 and {MAX_RECENT_ACTIVITIES}")
+    return count
+
+# Supported bulk export formats: mimetype and file extension
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'parquet': ('application/zip', 'zip'),
+}
+
+# Metrics snapshots are refreshed after imports and nightly by a background thread
+METRICS_SCHEDULER_ENABLED = os.environ.get("METRICS_SCHEDULER", "1") != "0"
+
+@app.before_request
+def ensure_metrics_scheduler():
+    """
+    Start the metrics scheduler in a process that serves requests
+    
+    Importing the app has no side effects, so the reloader parent, CLI
+    commands and spawned import workers never run a scheduler.
+    """
+    if METRICS_SCHEDULER_ENABLED:
+        start_metrics_scheduler(app)
+
+def set_metrics_headers(response, snapshots, live_count=0):
+    """Describe where served metrics came from and how fresh the oldest snapshot is"""
+    if not snapshots:
+        response.headers['X-Metrics-Source'] = 'live'
+        return response
+    
+    oldest = min(snapshots, key=lambda snapshot: snapshot['computed_at'])
+    response.headers['X-Metrics-Source'] = 'mixed' if live_count else 'snapshot'
+    response.headers['X-Metrics-As-Of'] = oldest['as_of'].isoformat()
+    response.headers['X-Metrics-Computed-At'] = oldest['computed_at'].isoformat()
+    response.headers['X-Metrics-Stale'] = 'true' if any(snapshot['stale'] for snapshot in snapshots) else 'false'
+    return response
+
+# Default and upper limit of points per series returned by the chart endpoint
+DEFAULT_CHART_POINTS = 500
+MAX_CHART_POINTS = 5000
+
 # Define static folder for web interface
 STATIC_FOLDER = 'static'
 if not os.path.exists(STATIC_FOLDER):
@@ -44,10 +147,40 @@ def index():
 
 @app.route('/api/households', methods=['GET'])
 def get_households():
-    """Return list of all households (clients)"""
+    """
+    Return list of all households (clients)
+    
+    With a 'limit' parameter the list is paginated by ID: the X-Next-Cursor
+    response header holds the 'cursor' parameter for the next page. Answers
+    304 when the households are unchanged since the client's copy.
+    """
+    try:
+        limit = request_page_size()
+
+        def build():
+            households, next_cursor = page_households(limit, request.args.get('cursor'))
+            return paginated_response(to_records(Household, households), next_cursor)
+
+        return conditional_response(resource_validators(table_state(Household)), build)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/dashboard/summary', methods=['GET'])
+def get_dashboard_summary():
+    """
+    Return client count, total AUM, average age and segment mix for the book
+    
+    Aggregated in the database; 'segment' and 'risk_profile' query
+    parameters narrow the summary to matching households.
+    """
     try:
-        households = Household.query.all()
-        return jsonify([household.to_dict() for household in households])
+        summary = load_client_summary(
+            segment=request.args.get('segment'),
+            risk_profile=request.args.get('risk_profile')
+        )
+        return jsonify(summary)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -55,11 +188,14 @@ def get_households():
 def get_household(household_id):
     """Return a specific household details"""
     try:
-        household = Household.query.get(household_id)
-        if household:
-            return jsonify(household.to_dict())
-        else:
-            return jsonify({"error": f"Household with ID {household_id} not found"}), 404
+        def build():
+            household = Household.query.get(household_id)
+            if household:
+                return jsonify(household.to_dict())
+            else:
+                return jsonify({"error": f"Household with ID {household_id} not found"}), 404
+
+        return conditional_response(resource_validators(table_state(Household, Household.id == household_id)), build)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -67,60 +203,206 @@ def get_household(household_id):
 def get_household_accounts(household_id):
     """Return all accounts for a specific household"""
     try:
-        accounts = Account.query.filter_by(household_id=household_id).all()
-        return jsonify([account.to_dict() for account in accounts])
+        criteria = Account.household_id == household_id
+        return conditional_response(resource_validators(table_state(Account, criteria)),
+                                    lambda: json_response(load_records(Account, criteria)))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/households/<int:household_id>/snapshot', methods=['GET'])
+def get_household_snapshot(household_id):
+    """
+    Return a household with its accounts, latest account metrics, goals and recent activities
+    
+    'activities' sets the number of recent activities per account (default 10).
+    """
+    try:
+        households, snapshots, live_count = load_household_snapshots([household_id], request_recent_activities())
+        if household_id not in households:
+            return jsonify({"error": f"Household with ID {household_id} not found"}), 404
+        return set_metrics_headers(json_response(households[household_id]), snapshots, live_count)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/households/snapshots', methods=['GET'])
+def get_household_snapshots():
+    """
+    Return the snapshots of the households listed in 'ids' (comma separated)
+    
+    Snapshots are returned in the order of 'ids'; unknown IDs are left out.
+    'activities' sets the number of recent activities per account (default 10).
+    """
+    try:
+        ids = request.args.get('ids')
+        household_ids = list(dict.fromkeys(int(household_id) for household_id in ids.split(','))) if ids else []
+    except ValueError:
+        return jsonify({"error": "ids must be a comma separated list of integers"}), 400
+    if not 1 <= len(household_ids) <= MAX_SNAPSHOT_HOUSEHOLDS:
+        return jsonify({"error": f"ids must list between 1 and {MAX_SNAPSHOT_HOUSEHOLDS} households"}), 400
+
+    try:
+        households, snapshots, live_count = load_household_snapshots(household_ids, request_recent_activities())
+        items = [households[household_id] for household_id in household_ids if household_id in households]
+        return set_metrics_headers(json_response(items), snapshots, live_count)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/accounts/<int:account_id>/activities', methods=['GET'])
 def get_account_activities(account_id):
-    """Return recent activities for a specific account"""
+    """
+    Return recent activities for a specific account, newest first
+    
+    Optional filters: 'from' and 'to' dates (inclusive) and 'type'. With a
+    'limit' parameter the list is paginated by (date, id): the X-Next-Cursor
+    response header holds the 'cursor' parameter for the next page.
+    """
     try:
-        activities = Activity.query.filter_by(account_id=account_id).order_by(Activity.date.desc()).all()
-        return jsonify([activity.to_dict() for activity in activities])
+        limit = request_page_size()
+        start = dateutil.parser.parse(request.args['from']) if request.args.get('from') else None
+        end = dateutil.parser.parse(request.args['to']) if request.args.get('to') else None
+        if end is not None and end == end.replace(hour=0, minute=0, second=0, microsecond=0):
+            # A plain 'to' date includes the whole day
+            end += timedelta(days=1)
+        activities, next_cursor = page_activities(
+            account_id, limit, request.args.get('cursor'),
+            start=start, end=end, activity_type=request.args.get('type')
+        )
+        return paginated_response(to_records(Activity, activities), next_cursor)
+    except (ValueError, OverflowError) as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/accounts/<int:account_id>/performance', methods=['GET'])
 def get_account_performance(account_id):
-    """Return performance metrics for a specific account"""
-    try:
-        # Get all performance records for this account
-        performance_records = Performance.query.filter_by(account_id=account_id).all()
-        
-        # Convert to DataFrame for processing with existing functions
-        performance_data = []
-        for record in performance_records:
-            record_data = {
-                'account_id': record.account_id,
-                'date': record.date
-            }
-            
-            # Only add non-null values
-            if record.value is not None:
-                record_data['value'] = record.value
-                
-            if record.return_pct is not None:
-                record_data['return_pct'] = record.return_pct
-                
-            if record.asset_type is not None:
-                record_data['asset_type'] = record.asset_type
-                
-            if record.allocation_pct is not None:
-                record_data['allocation_pct'] = record.allocation_pct
-            
-            performance_data.append(record_data)
+    """
+    Return performance metrics for a specific account
+    
+    Metrics come from the latest account_metrics snapshot, with its freshness
+    in the X-Metrics-* headers; they are computed live when the account has
+    no snapshot yet or when live=1 is passed. Volatility and max drawdown are
+    read from the account's running aggregates in account_stats.
+    """
+    try:
+        if not request_flag('live'):
+            snapshot = get_metrics_snapshots([account_id]).get(account_id)
+            if snapshot:
+                metrics = apply_running_stats(snapshot['metrics'], account_id)
+                return set_metrics_headers(jsonify(metrics), [snapshot])
         
-        if not performance_data:
+        # Computed from the account's performance rows, cached until the data changes
+        metrics = get_account_metrics(account_id)
+        if metrics is None:
             return jsonify({"error": "No performance data available for this account"}), 404
             
-        # Convert to DataFrame and process
-        performance_df = pd.DataFrame(performance_data)
-        metrics = process_account_performance(performance_df)
-        return jsonify(metrics)
+        schedule_metrics_refresh([account_id])
+        return set_metrics_headers(jsonify(apply_running_stats(metrics, account_id)), [])
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/accounts/<int:account_id>/chart', methods=['GET'])
+def get_account_chart(account_id):
+    """
+    Return value, return and allocation chart data for a specific account
+    
+    Long series are downsampled to at most 'max_points' points each
+    (default 500, at least 3, at most 5000).
+    """
+    try:
+        max_points = int(request.args.get('max_points', DEFAULT_CHART_POINTS))
+    except ValueError:
+        return jsonify({"error": "max_points must be an integer"}), 400
+    if not 3 <= max_points <= MAX_CHART_POINTS:
+        return jsonify({"error": f"max_points must be between 3 and {MAX_CHART_POINTS}"}), 400
+    
+    try:
+        chart_data = get_account_chart_data(account_id, max_points)
+        if chart_data is None:
+            return jsonify({"error": "No performance data available for this account"}), 404
+        return jsonify(chart_data)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/accounts/<int:account_id>/returns', methods=['GET'])
+def get_account_returns(account_id):
+    """
+    Return window returns and drawdowns for a specific account
+
+    Query parameters 'from' and 'to' (YYYY-MM-DD, both optional) select one
+    custom window; 'periods' takes a comma separated list of named periods
+    (mtd, qtd, ytd, 1y, 3y, 5y, inception). Without either, all named
+    periods are returned.
+    """
+    try:
+        start = dateutil.parser.parse(request.args['from']) if request.args.get('from') else None
+        end = dateutil.parser.parse(request.args['to']) if request.args.get('to') else None
+    except (ValueError, OverflowError):
+        return jsonify({"error": "from and to must be dates in YYYY-MM-DD format"}), 400
+
+    periods = request.args.get('periods')
+    periods = [period.strip().lower() for period in periods.split(',') if period.strip()] if periods else []
+    unknown = [period for period in periods if period not in RETURN_PERIODS]
+    if unknown:
+        return jsonify({"error": f"Unknown periods: {', '.join(unknown)}. Valid periods: {', '.join(RETURN_PERIODS)}"}), 400
+    if start and end and start > end:
+        return jsonify({"error": "from must not be after to"}), 400
+
+    try:
+        index = get_return_index(account_id)
+        if index.empty:
+            return jsonify({"error": "No performance data available for this account"}), 404
+
+        windows = []
+        if start or end:
+            windows.append(index.window(start, end))
+        if periods or not windows:
+            windows.extend(index.period_window(period) for period in periods or RETURN_PERIODS)
+
+        return jsonify({"account_id": account_id, "windows": windows})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/accounts/<int:account_id>/stats', methods=['GET'])
+def get_account_running_stats(account_id):
+    """Return the running performance aggregates of a specific account"""
+    try:
+        stats = get_account_stats(account_id)
+        if stats is None:
+            return jsonify({"error": "No performance statistics available for this account"}), 404
+        return jsonify(stats.to_dict())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/performance', methods=['GET'])
+def get_performance_batch():
+    """Return performance metrics for many accounts, keyed by account ID"""
+    try:
+        ids = request.args.get('account_ids')
+        account_ids = [int(account_id) for account_id in ids.split(',')] if ids else None
+    except ValueError:
+        return jsonify({"error": "account_ids must be a comma separated list of integers"}), 400
+    
+    try:
+        if request_flag('live'):
+            return set_metrics_headers(jsonify(process_performance_batch(load_performance_df(account_ids))), [])
+        
+        # Serve snapshots where they exist and compute the rest live
+        if account_ids is None:
+            account_ids = [account_id for account_id, in db.session.query(Performance.account_id).distinct()]
+        metrics, snapshots, live_count = latest_account_metrics(account_ids)
+        return set_metrics_headers(jsonify(metrics), snapshots, live_count)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Return size and hit/miss counters of this process's metrics cache"""
+    return jsonify(cache_stats())
+
 @app.route('/api/import/excel', methods=['POST'])
 def import_excel():
     """Import client data from an uploaded Excel file"""
@@ -131,106 +413,64 @@ def import_excel():
     if file.filename == '':
         return jsonify({"error": "No selected file"}), 400
     
-    if not file.filename.endswith(('.xlsx', '.xls', '.csv')):
-        return jsonify({"error": "Invalid file format, please upload Excel or CSV file"}), 400
+    if not file.filename.endswith(('.xlsx', '.xls', '.csv', '.parquet', '.zip')):
+        return jsonify({"error": "Invalid file format, please upload Excel, CSV or Parquet file"}), 400
+    
+    # CSV and Parquet files hold a single table, named by the 'table' parameter or the file name
+    if file.filename.endswith(('.csv', '.parquet')):
+        table = table_for_sheet(request.values.get('table') or os.path.splitext(file.filename)[0])
+        if table is None:
+            return jsonify({"error": "Could not determine the target table, please provide a 'table' parameter"}), 400
+        if file.filename.endswith('.csv'):
+            import_func = partial(run_csv_import, table=table, delta=request_flag('delta'))
+            target = f"csv:{table}"
+        else:
+            import_func = partial(run_parquet_import, table=table, delta=request_flag('delta'))
+            target = f"parquet:{table}"
+    elif file.filename.endswith('.zip'):
+        # Zip archives hold one Parquet file per sheet
+        import_func = partial(run_parquet_import, delta=request_flag('delta'))
+        target = 'parquet'
+    else:
+        import_func = partial(run_excel_import, parallel=request_flag('parallel'), delta=request_flag('delta'))
+        target = 'workbook'
+    
+    # Delta imports overwrite rows, so they are remembered apart from insert-only imports
+    if request_flag('delta'):
+        target += DELTA_TARGET_SUFFIX
     
     try:
+        # Identical re-uploads return the result of the earlier import unless forced
+        digest = stream_digest(file.stream)
+        file.stream.seek(0)
+        if not request_flag('force'):
+            imported = find_imported_file(digest, target)
+            if imported:
+                return jsonify({
+                    "message": "File already imported",
+                    "import_count": json.loads(imported.import_count),
+                    "cached": True,
+                    "imported_at": imported.imported_at.isoformat()
+                })
+        import_func = refresh_after_import(remember_import(import_func, digest, target, file.filename))
+        
+        # Large uploads can be imported in the background and polled for progress
+        if request_flag('async'):
+            filepath = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4().hex}_{file.filename}")
+            file.save(filepath)
+            job = submit_import_job(app, import_func, filepath, file.filename)
+            return jsonify({
+                "message": "Import queued",
+                "job_id": job.id,
+                "status_url": f"/api/import/jobs/{job.id}"
+            }), 202
+        
         # Save the file temporarily
         filepath = os.path.join(UPLOAD_FOLDER, file.filename)
         file.save(filepath)
         
-        # Process the file
-        sheet_names = pd.ExcelFile(filepath).sheet_names
-        
-        # Import data into database
-        import_count = {
-            'households': 0,
-            'accounts': 0,
-            'activities': 0,
-            'performance': 0
-        }
-        
-        # Process each sheet
-        for sheet in sheet_names:
-            df = read_excel_file(filepath, sheet)
-            
-            # Import households
-            if sheet.lower() == 'clients' or sheet.lower() == 'households':
-                for _, row in df.iterrows():
-                    # Check if household already exists
-                    household = Household.query.filter_by(id=row.get('client_id', row.get('household_id', row.get('id')))).first()
-                    
-                    if not household:
-                        household = Household(
-                            id=row.get('client_id', row.get('household_id', row.get('id'))),
-                            name=row.get('name', ''),
-                            email=row.get('email', ''),
-                            phone=row.get('phone', ''),
-                            birth_date=dateutil.parser.parse(row['birth_date']) if 'birth_date' in row and row['birth_date'] else None,
-                            risk_profile=row.get('risk_profile', ''),
-                            segment=row.get('segment', ''),
-                            total_assets=row.get('total_assets', 0)
-                        )
-                        db.session.add(household)
-                        import_count['households'] += 1
-            
-            # Import accounts
-            elif sheet.lower() == 'accounts':
-                for _, row in df.iterrows():
-                    # Check if account already exists
-                    account = Account.query.filter_by(id=row.get('account_id', row.get('id'))).first()
-                    
-                    if not account:
-                        account = Account(
-                            id=row.get('account_id', row.get('id')),
-                            household_id=row.get('client_id', row.get('household_id')),
-                            account_type=row.get('account_type', ''),
-                            opening_date=dateutil.parser.parse(row['opening_date']) if 'opening_date' in row and row['opening_date'] else None,
-                            current_balance=row.get('current_balance', 0),
-                            currency=row.get('currency', 'USD')
-                        )
-                        db.session.add(account)
-                        import_count['accounts'] += 1
-            
-            # Import activities
-            elif sheet.lower() == 'activities':
-                for _, row in df.iterrows():
-                    # Check if activity already exists
-                    activity = Activity.query.filter_by(id=row.get('activity_id', row.get('id'))).first()
-                    
-                    if not activity:
-                        activity = Activity(
-                            id=row.get('activity_id', row.get('id')),
-                            account_id=row.get('account_id'),
-                            date=dateutil.parser.parse(row['date']) if 'date' in row and row['date'] else datetime.now(),
-                            type=row.get('type', ''),
-                            description=row.get('description', ''),
-                            amount=row.get('amount', 0)
-                        )
-                        db.session.add(activity)
-                        import_count['activities'] += 1
-            
-            # Import performance
-            elif sheet.lower() == 'performance':
-                for _, row in df.iterrows():
-                    # Check if performance record already exists
-                    performance = Performance.query.filter_by(id=row.get('record_id', row.get('id'))).first()
-                    
-                    if not performance:
-                        performance = Performance(
-                            id=row.get('record_id', row.get('id')),
-                            account_id=row.get('account_id'),
-                            date=dateutil.parser.parse(row['date']) if 'date' in row and row['date'] else datetime.now(),
-                            value=row.get('value'),
-                            return_pct=row.get('return_pct'),
-                            asset_type=row.get('asset_type'),
-                            allocation_pct=row.get('allocation_pct')
-                        )
-                        db.session.add(performance)
-                        import_count['performance'] += 1
-        
-        # Commit all changes to database
-        db.session.commit()
+        # Import data into database with set-based bulk inserts
+        import_count = import_func(filepath)
         
         # Clean up the file
         os.remove(filepath)
@@ -239,11 +479,84 @@ def import_excel():
             "message": "Data imported successfully",
             "import_count": import_count
         })
+    except ImportDataError as e:
+        db.session.rollback()
+        return jsonify({
+            "error": str(e),
+            "invalid_count": e.invalid_count,
+            "invalid_cells": e.invalid_cells
+        }), 400
     except Exception as e:
         # Rollback in case of error
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/import/jobs/<job_id>', methods=['GET'])
+def get_import_job_status(job_id):
+    """Return progress and outcome of a background import job"""
+    job = get_import_job(job_id)
+    if not job:
+        return jsonify({"error": f"Import job {job_id} not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/export', methods=['GET'])
+def export_data():
+    """Export households, accounts, activities and performance as CSV, NDJSON, Excel or Parquet"""
+    export_format = request.args.get('format', 'parquet').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported export format: {export_format}"}), 400
+    
+    try:
+        names = request.args.get('tables') or request.args.get('table')
+        tables = resolve_export_tables(names.split(',') if names else None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        stamp = datetime.now().strftime('%Y%m%d')
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        
+        # Text formats are streamed straight from a server-side cursor
+        if export_format == 'csv':
+            if len(tables) != 1:
+                return jsonify({"error": "CSV export needs exactly one table, e.g. table=performance"}), 400
+            sheet, model = tables[0]
+            body = stream_csv(model)
+            filename = f"{sheet.lower()}_{stamp}.{extension}"
+        elif export_format == 'ndjson':
+            body = stream_ndjson(tables)
+            filename = f"book_of_business_{stamp}.{extension}"
+        
+        if export_format in ('csv', 'ndjson'):
+            return app.response_class(
+                stream_with_context(body),
+                mimetype=mimetype,
+                headers={"Content-Disposition": f"attachment; filename={filename}"}
+            )
+        
+        # Binary formats are written to a temporary file first, still chunk by chunk
+        fd, export_path = tempfile.mkstemp(suffix=f".{extension}")
+        os.close(fd)
+        
+        @after_this_request
+        def remove_export_file(response):
+            os.remove(export_path)
+            return response
+        
+        if export_format == 'xlsx':
+            export_xlsx(export_path, tables)
+        else:
+            export_parquet(export_path, tables)
+        
+        return send_file(
+            export_path,
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=f"book_of_business_{stamp}.{extension}"
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # Create sample data
 @app.route('/api/create-sample-data', methods=['POST'])
 def create_sample_data():
@@ -262,120 +575,10 @@ def create_sample_data():
         # Create sample Excel file
         sample_file = create_sample_excel()
         
-        # Process the Excel file directly without going through import_excel
+        # Import the sample workbook with the bulk import engine
         try:
-            # Define the sheets to process
-            sheets = ['Clients', 'Accounts', 'Activities', 'Performance']
-            
-            # Import counts
-            import_count = {
-                'households': 0,
-                'accounts': 0,
-                'activities': 0,
-                'performance': 0
-            }
-            
-            # Load the Excel file into a dictionary of DataFrames
-            excel_data = pd.read_excel(sample_file, sheet_name=sheets)
+            import_count = run_excel_import(sample_file)
             
-            # Process clients/households
-            if 'Clients' in excel_data:
-                df = excel_data['Clients']
-                for _, row in df.iterrows():
-                    # Check if household already exists
-                    household = Household.query.filter_by(id=row.get('client_id')).first()
-                    
-                    if not household:
-                        household = Household(
-                            id=row.get('client_id'),
-                            name=row.get('name', ''),
-                            email=row.get('email', ''),
-                            phone=row.get('phone', ''),
-                            birth_date=dateutil.parser.parse(row['birth_date']) if 'birth_date' in row and pd.notna(row['birth_date']) else None,
-                            risk_profile=row.get('risk_profile', ''),
-                            segment=row.get('segment', ''),
-                            total_assets=row.get('total_assets', 0)
-                        )
-                        db.session.add(household)
-                        import_count['households'] += 1
-            
-            # Process accounts
-            if 'Accounts' in excel_data:
-                df = excel_data['Accounts']
-                for _, row in df.iterrows():
-                    # Check if account already exists
-                    account = Account.query.filter_by(id=row.get('account_id')).first()
-                    
-                    if not account:
-                        account = Account(
-                            id=row.get('account_id'),
-                            household_id=row.get('client_id'),
-                            account_type=row.get('account_type', ''),
-                            opening_date=dateutil.parser.parse(row['opening_date']) if 'opening_date' in row and pd.notna(row['opening_date']) else None,
-                            current_balance=row.get('current_balance', 0),
-                            currency=row.get('currency', 'USD')
-                        )
-                        db.session.add(account)
-                        import_count['accounts'] += 1
-            
-            # Process activities
-            if 'Activities' in excel_data:
-                df = excel_data['Activities']
-                for _, row in df.iterrows():
-                    # Check if activity already exists
-                    activity = Activity.query.filter_by(id=row.get('activity_id')).first()
-                    
-                    if not activity:
-                        activity = Activity(
-                            id=row.get('activity_id'),
-                            account_id=row.get('account_id'),
-                            date=dateutil.parser.parse(row['date']) if 'date' in row and pd.notna(row['date']) else datetime.now(),
-                            type=row.get('type', ''),
-                            description=row.get('description', ''),
-                            amount=row.get('amount', 0)
-                        )
-                        db.session.add(activity)
-                        import_count['activities'] += 1
-            
-            # Process performance
-            if 'Performance' in excel_data:
-                df = excel_data['Performance']
-                for _, row in df.iterrows():
-                    # Check if performance record already exists
-                    performance = Performance.query.filter_by(id=row.get('record_id')).first()
-                    
-                    if not performance:
-                        # Create a new performance record
-                        perf_data = {
-                            'id': row.get('record_id'),
-                            'account_id': row.get('account_id'),
-                            'date': dateutil.parser.parse(row['date']) if 'date' in row and pd.notna(row['date']) else datetime.now(),
-                        }
-                        
-                        # Handle optional fields
-                        if 'value' in row and pd.notna(row['value']):
-                            perf_data['value'] = row['value']
-                        
-                        if 'return_pct' in row and pd.notna(row['return_pct']):
-                            perf_data['return_pct'] = row['return_pct']
-                            
-                        if 'asset_type' in row and pd.notna(row['asset_type']):
-                            perf_data['asset_type'] = row['asset_type']
-                            
-                        if 'allocation_pct' in row and pd.notna(row['allocation_pct']):
-                            perf_data['allocation_pct'] = row['allocation_pct']
-                        
-                        performance = Performance(**perf_data)
-                        db.session.add(performance)
-                        import_count['performance'] += 1
-            
-            # Commit all changes to database
-            try:
-                db.session.commit()
-            except Exception as commit_error:
-                db.session.rollback()
-                raise Exception(f"Database commit error: {str(commit_error)}")
-
             # Clean up the file
             os.remove(sample_file)
             
@@ -433,38 +636,8 @@ def generate_account_report(account_id):
         if not account:
             return jsonify({"error": f"Account with ID {account_id} not found"}), 404
         
-        # Get performance data
-        performance_records = Performance.query.filter_by(account_id=account_id).all()
-        
-        # Convert to DataFrame for processing
-        performance_data = []
-        for record in performance_records:
-            record_data = {
-                'account_id': record.account_id,
-                'date': record.date
-            }
-            
-            # Only add non-null values
-            if record.value is not None:
-                record_data['value'] = record.value
-                
-            if record.return_pct is not None:
-                record_data['return_pct'] = record.return_pct
-                
-            if record.asset_type is not None:
-                record_data['asset_type'] = record.asset_type
-                
-            if record.allocation_pct is not None:
-                record_data['allocation_pct'] = record.allocation_pct
-            
-            performance_data.append(record_data)
-        
-        # Process performance data if available
-        if performance_data:
-            performance_df = pd.DataFrame(performance_data)
-            metrics = process_account_performance(performance_df)
-        else:
-            metrics = {}
+        # Get performance data and process it if available
+        metrics = get_account_metrics(account_id) or {}
         
         # Get recent activities
         activities = Activity.query.filter_by(account_id=account_id).order_by(Activity.date.desc()).limit(10).all()
@@ -489,12 +662,35 @@ def generate_account_report(account_id):
         return jsonify({"error": str(e)}), 500
 
 # Financial Goals API endpoints
+@app.route('/api/households/<int:household_id>/performance', methods=['GET'])
+def get_household_performance(household_id):
+    """Return value-weighted performance metrics across all accounts of a household"""
+    try:
+        household = Household.query.get(household_id)
+        if not household:
+            return jsonify({"error": f"Household with ID {household_id} not found"}), 404
+        
+        # Every account's series in one query
+        account_ids = [account_id for account_id, in
+                       db.session.query(Account.id).filter(Account.household_id == household_id)]
+        performance_df = load_performance_df(account_ids)
+        if performance_df.empty:
+            return jsonify({"error": "No performance data available for this household"}), 404
+        
+        metrics = process_household_performance(performance_df)
+        metrics['household_id'] = household_id
+        return jsonify(metrics)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/households/<int:household_id>/goals', methods=['GET'])
 def get_household_goals(household_id):
     """Return all financial goals for a specific household"""
     try:
-        goals = FinancialGoal.query.filter_by(household_id=household_id).all()
-        return jsonify([goal.to_dict() for goal in goals])
+        criteria = FinancialGoal.household_id == household_id
+        # days_remaining changes every day
+        return conditional_response(resource_validators(table_state(FinancialGoal, criteria), daily=True),
+                                    lambda: json_response(load_records(FinancialGoal, criteria)))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -502,23 +698,104 @@ def get_household_goals(household_id):
 def get_account_goals(account_id):
     """Return all financial goals for a specific account"""
     try:
-        goals = FinancialGoal.query.filter_by(account_id=account_id).all()
-        return jsonify([goal.to_dict() for goal in goals])
+        criteria = FinancialGoal.account_id == account_id
+        return conditional_response(resource_validators(table_state(FinancialGoal, criteria), daily=True),
+                                    lambda: json_response(load_records(FinancialGoal, criteria)))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/goals/<int:goal_id>', methods=['GET'])
 def get_goal(goal_id):
     """Return a specific financial goal"""
+    try:
+        def build():
+            goal = FinancialGoal.query.get(goal_id)
+            if goal:
+                # Include progress updates
+                goal_dict = goal.to_dict()
+                goal_dict['progress_updates'] = load_records(GoalProgressUpdate, GoalProgressUpdate.goal_id == goal_id)
+                return json_response(goal_dict)
+            else:
+                return jsonify({"error": f"Financial goal with ID {goal_id} not found"}), 404
+
+        validators = resource_validators(
+            table_state(FinancialGoal, FinancialGoal.id == goal_id),
+            table_state(GoalProgressUpdate, GoalProgressUpdate.goal_id == goal_id, column=GoalProgressUpdate.created_at),
+            daily=True
+        )
+        return conditional_response(validators, build)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def projection_options():
+    """
+    Read the Monte Carlo options of a projection request
+    
+    Returns:
+        Tuple of paths, seed and monthly contribution
+        
+    Raises:
+        ValueError: If an option is not a valid number or is out of range
+    """
+    paths = int(request.args.get('paths', DEFAULT_PROJECTION_PATHS))
+    seed = int(request.args.get('seed', DEFAULT_PROJECTION_SEED))
+    monthly_contribution = float(request.args.get('monthly_contribution', 0.0))
+    if paths < 1 or seed < 0 or monthly_contribution < 0:
+        raise ValueError("paths must be positive and seed and monthly_contribution must not be negative")
+    return paths, seed, monthly_contribution
+
+@app.route('/api/goals/<int:goal_id>/projection', methods=['GET'])
+def get_goal_projection(goal_id):
+    """
+    Return a Monte Carlo projection of a financial goal up to its target date
+    
+    Optional query parameters: paths (capped server side), seed and
+    monthly_contribution.
+    """
+    try:
+        paths, seed, monthly_contribution = projection_options()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid projection options: {str(e)}"}), 400
+    
     try:
         goal = FinancialGoal.query.get(goal_id)
-        if goal:
-            # Include progress updates
-            goal_dict = goal.to_dict()
-            goal_dict['progress_updates'] = [update.to_dict() for update in goal.progress_updates]
-            return jsonify(goal_dict)
-        else:
+        if not goal:
             return jsonify({"error": f"Financial goal with ID {goal_id} not found"}), 404
+        if not goal.target_date:
+            return jsonify({"error": "Financial goal has no target date to project to"}), 400
+        
+        return jsonify(project_goal(goal, paths, seed, monthly_contribution))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/households/<int:household_id>/projection', methods=['GET'])
+def get_household_projection(household_id):
+    """Return Monte Carlo projections of all in-progress goals of a household"""
+    try:
+        paths, seed, monthly_contribution = projection_options()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid projection options: {str(e)}"}), 400
+    
+    try:
+        household = Household.query.get(household_id)
+        if not household:
+            return jsonify({"error": f"Household with ID {household_id} not found"}), 404
+        
+        goals = FinancialGoal.query.filter_by(household_id=household_id, status='In Progress') \
+            .order_by(FinancialGoal.priority, FinancialGoal.id).all()
+        
+        # Goals without an account share one load of the household history
+        household_histories = {}
+        projections = []
+        for goal in goals:
+            if not goal.target_date:
+                projections.append({"goal_id": goal.id, "name": goal.name,
+                                     "error": "Financial goal has no target date to project to"})
+                continue
+            # Each goal gets its own reproducible random stream; seed >= 0 and positive IDs keep it valid
+            projections.append(project_goal(goal, paths, seed + goal.id, monthly_contribution, household_histories))
+        
+        return jsonify({"household_id": household_id, "goals": projections})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -740,6 +1017,37 @@ def create_sample_goals():
         print(f"Traceback: {error_details}")
         return jsonify({"error": str(e), "traceback": error_details}), 500
 
+@app.cli.command('rebuild-account-stats')
+@click.option('--account-id', 'account_ids', type=int, multiple=True,
+              help='Account to rebuild (repeatable); defaults to every account')
+def rebuild_account_stats_command(account_ids):
+    """Recompute the running account statistics from the full performance history"""
+    rebuilt = rebuild_account_stats(account_ids or None)
+    db.session.commit()
+    click.echo(f"Rebuilt statistics for {rebuilt} accounts")
+
+@app.cli.command('refresh-account-metrics')
+@click.option('--all', 'refresh_all', is_flag=True, help='Recompute snapshots that are already current')
+def refresh_account_metrics_command(refresh_all):
+    """Compute today's account metrics snapshots"""
+    refreshed = refresh_account_metrics(only_stale=not refresh_all)
+    click.echo(f"Refreshed metrics snapshots for {refreshed} accounts")
+
+@app.cli.command('check-query-plans')
+@click.option('--verbose', is_flag=True, help='Print the full plan of every query')
+def check_query_plans_command(verbose):
+    """Check that the per-account and per-household queries use their indexes"""
+    results = check_query_plans()
+    for result in results:
+        status = 'ok' if result['used'] else 'MISSING'
+        click.echo(f"{status:8} {result['name']} ({result['index']})")
+        if verbose or not result['used']:
+            click.echo('         ' + result['plan'].replace('\n', '\n         '))
+
+    missing = [result['index'] for result in results if not result['used']]
+    if missing:
+        raise click.ClickException(f"Indexes not used: {', '.join(missing)}")
+
 # Tables are created in app_entry.py when run directly
 # The following code will only run if this file is executed directly
 if __name__ == '__main__':
@@ -42,6 +42,21 @@ def process_client_data(client_df):
         "segment_distribution": segment_distribution
     }
 
+# Allocation reported when an account has no asset allocation records
+DEFAULT_ALLOCATION = {"Stocks": 60, "Bonds": 30, "Cash": 10}
+
+def _default_metrics():
+    """Metrics reported for an account without usable performance data"""
+    return {
+        "ytd_return": 0.0,
+        "one_yr_return": 0.0,
+        "three_yr_return": 0.0,
+        "five_yr_return": 0.0,
+        "volatility": 0.0,
+        "max_drawdown": 0.0,
+        "allocation": dict(DEFAULT_ALLOCATION)
+    }
+
 def process_account_performance(performance_df):
     """
     Calculate performance metrics for an account
@@ -55,104 +70,276 @@ def process_account_performance(performance_df):
     if performance_df.empty:
         return {"error": "No performance data available"}
     
-    # Filter out rows with missing values for date
-    performance_df = performance_df.dropna(subset=['date'])
-    
-    # Set default values
-    ytd_return = 0.0
-    one_yr_return = 0.0
-    three_yr_return = 0.0
-    five_yr_return = 0.0
-    volatility = 0.0
-    max_drawdown = 0.0
-    allocation = {"Stocks": 60, "Bonds": 30, "Cash": 10}  # Default allocation if none found
+    # A single account is a batch of one
+    metrics = process_performance_batch(performance_df.assign(account_id=0))
+    return metrics.get(0, _default_metrics())
+
+def process_performance_batch(performance_df, as_of=None):
+    """
+    Calculate performance metrics for many accounts in one vectorized pass
     
-    # Sort by date
-    if 'date' in performance_df.columns:
-        performance_df['date'] = pd.to_datetime(performance_df['date'])
-        performance_df = performance_df.sort_values('date')
+    Produces the same metrics as process_account_performance for every
+    account, using groupby operations over the combined rows instead of
+    filtering each account and window separately.
     
-    # Calculate return metrics if return_pct is available
-    if 'return_pct' in performance_df.columns:
-        # Drop any NaN values for return_pct
-        return_df = performance_df.dropna(subset=['return_pct'])
+    Args:
+        performance_df: DataFrame containing performance data with an
+            'account_id' column
+        as_of: Reference date for the YTD/1y/3y/5y windows (optional,
+            defaults to now)
         
+    Returns:
+        Dictionary mapping account_id to its metrics dictionary
+    """
+    if performance_df.empty or 'date' not in performance_df.columns:
+        return {}
+    
+    # Filter out rows with missing values for date and sort by account and date
+    df = performance_df.dropna(subset=['date']).copy()
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values(['account_id', 'date'], kind='mergesort')
+    
+    account_ids = pd.Index(df['account_id'].unique(), name='account_id')
+    zeros = pd.Series(0.0, index=account_ids)
+    ytd_return = one_yr_return = three_yr_return = five_yr_return = volatility = max_drawdown = zeros
+    
+    # Window returns and volatility from the rows that have a return
+    if 'return_pct' in df.columns:
+        return_df = df[df['return_pct'].notna()]
         if not return_df.empty:
-            current_date = datetime.now()
+            current_date = as_of or datetime.now()
+            accounts = return_df['account_id']
+            returns = return_df['return_pct']
+            dates = return_df['date']
             
-            # YTD calculation
-            ytd_start = datetime(current_date.year, 1, 1)
-            ytd_data = return_df[return_df['date'] >= ytd_start]
-            if not ytd_data.empty:
-                ytd_return = ytd_data['return_pct'].sum()
+            def window(start):
+                in_window = dates >= start
+                sums = returns.where(in_window, 0.0).groupby(accounts).sum().reindex(account_ids, fill_value=0.0)
+                counts = in_window.groupby(accounts).sum().reindex(account_ids, fill_value=0)
+                return sums, counts
             
-            # 1 year calculation
-            one_yr_ago = current_date - timedelta(days=365)
-            one_yr_data = return_df[return_df['date'] >= one_yr_ago]
-            if not one_yr_data.empty:
-                one_yr_return = one_yr_data['return_pct'].sum()
+            ytd_return, _ = window(datetime(current_date.year, 1, 1))
+            one_yr_return, _ = window(current_date - timedelta(days=365))
             
-            # 3 year calculation (annualized)
-            three_yr_ago = current_date - timedelta(days=365*3)
-            three_yr_data = return_df[return_df['date'] >= three_yr_ago]
-            if not three_yr_data.empty and len(three_yr_data) > 3:
-                three_yr_return = ((1 + three_yr_data['return_pct'].sum()/100) ** (1/3) - 1) * 100
+            # 3 and 5 year returns are annualized once there are enough observations
+            three_yr_sum, three_yr_count = window(current_date - timedelta(days=365*3))
+            three_yr_return = pd.Series(
+                np.where(three_yr_count > 3, (np.power(1 + three_yr_sum/100, 1/3) - 1) * 100, 0.0),
+                index=account_ids)
+            five_yr_sum, five_yr_count = window(current_date - timedelta(days=365*5))
+            five_yr_return = pd.Series(
+                np.where(five_yr_count > 5, (np.power(1 + five_yr_sum/100, 1/5) - 1) * 100, 0.0),
+                index=account_ids)
             
-            # 5 year calculation (annualized)
-            five_yr_ago = current_date - timedelta(days=365*5)
-            five_yr_data = return_df[return_df['date'] >= five_yr_ago]
-            if not five_yr_data.empty and len(five_yr_data) > 5:
-                five_yr_return = ((1 + five_yr_data['return_pct'].sum()/100) ** (1/5) - 1) * 100
-                
-            # Calculate volatility if we have enough return data
-            if len(return_df) > 1:
-                volatility = return_df['return_pct'].std()
-    
-    # Calculate max drawdown if value is available
-    if 'value' in performance_df.columns:
-        # Drop any NaN values for value
-        value_df = performance_df.dropna(subset=['value'])
-        
-        if not value_df.empty and len(value_df) > 1:
-            # Calculate rolling maximum
-            rolling_max = value_df['value'].cummax()
-            # Calculate drawdown
-            drawdown = (value_df['value'] - rolling_max) / rolling_max
-            max_drawdown = drawdown.min() * 100  # Convert to percentage
+            # Volatility needs more than one return per account
+            volatility = returns.groupby(accounts).std().reindex(account_ids).fillna(0.0)
     
-    # Calculate portfolio allocation if available
-    if 'asset_type' in performance_df.columns and 'allocation_pct' in performance_df.columns:
-        # Filter out rows that have both asset_type and allocation_pct
-        alloc_df = performance_df.dropna(subset=['asset_type', 'allocation_pct'])
-        
+    # Max drawdown from the running maximum of each account's value
+    if 'value' in df.columns:
+        value_df = df[df['value'].notna()]
+        if not value_df.empty:
+            values = value_df['value']
+            rolling_max = values.groupby(value_df['account_id']).cummax()
+            drawdown = ((values - rolling_max) / rolling_max).groupby(value_df['account_id'])
+            max_drawdown = pd.Series(
+                np.where(drawdown.size() > 1, drawdown.min() * 100, 0.0),
+                index=drawdown.size().index).reindex(account_ids, fill_value=0.0)
+    
+    # Most recent allocation per account
+    allocations = {}
+    if 'asset_type' in df.columns and 'allocation_pct' in df.columns:
+        alloc_df = df.dropna(subset=['asset_type', 'allocation_pct'])
         if not alloc_df.empty:
-            # Take the most recent allocation
-            latest_date = alloc_df['date'].max()
+            latest_date = alloc_df.groupby('account_id')['date'].transform('max')
             latest_allocation = alloc_df[alloc_df['date'] == latest_date]
-            
-            # Only create allocation dict if we have valid data
-            if not latest_allocation.empty:
-                allocation = {}
-                for _, row in latest_allocation.iterrows():
-                    if row['asset_type'] is not None and row['allocation_pct'] is not None:
-                        allocation[row['asset_type']] = row['allocation_pct']
+            for account_id, asset_type, allocation_pct in zip(latest_allocation['account_id'],
+                                                               latest_allocation['asset_type'],
+                                                               latest_allocation['allocation_pct']):
+                allocations.setdefault(account_id, {})[asset_type] = allocation_pct
     
     return {
-        "ytd_return": round(ytd_return, 2),
-        "one_yr_return": round(one_yr_return, 2),
-        "three_yr_return": round(three_yr_return, 2),
-        "five_yr_return": round(five_yr_return, 2),
-        "volatility": round(volatility, 2),
-        "max_drawdown": round(max_drawdown, 2),
-        "allocation": allocation
+        # Plain Python keys so the result can be serialized to JSON directly
+        (account_id.item() if isinstance(account_id, np.generic) else account_id): {
+            "ytd_return": round(ytd_return[account_id], 2),
+            "one_yr_return": round(one_yr_return[account_id], 2),
+            "three_yr_return": round(three_yr_return[account_id], 2),
+            "five_yr_return": round(five_yr_return[account_id], 2),
+            "volatility": round(volatility[account_id], 2),
+            "max_drawdown": round(max_drawdown[account_id], 2),
+            "allocation": allocations.get(account_id, dict(DEFAULT_ALLOCATION))
+        }
+        for account_id in account_ids
     }
 
-def generate_performance_chart_data(performance_df):
+def combine_account_series(performance_df):
+    """
+    Align several accounts' performance on their dates and combine them into one series
+    
+    Values are carried forward between observations and summed; each
+    date's return is the average of the account returns weighted by the
+    accounts' values on the previous date.
+    
+    Args:
+        performance_df: DataFrame containing performance data with an
+            'account_id' column and datetime 'date' values
+        
+    Returns:
+        Tuple of the combined DataFrame (date, value, return_pct) and the
+        dates x accounts DataFrame of carried-forward values
+    """
+    dates = pd.DatetimeIndex(performance_df['date'].unique()).sort_values()
+    
+    # Accounts x dates matrices; values hold between observations
+    if 'value' in performance_df.columns:
+        values = performance_df.dropna(subset=['value']).pivot_table(
+            index='date', columns='account_id', values='value', aggfunc='last')
+        values = values.reindex(dates).ffill()
+    else:
+        values = pd.DataFrame(index=dates)
+    if 'return_pct' in performance_df.columns:
+        returns = performance_df.dropna(subset=['return_pct']).pivot_table(
+            index='date', columns='account_id', values='return_pct', aggfunc='last')
+        returns = returns.reindex(index=dates, columns=returns.columns.union(values.columns))
+    else:
+        returns = pd.DataFrame(index=dates)
+    values = values.reindex(columns=returns.columns.union(values.columns))
+    returns = returns.reindex(columns=values.columns)
+    
+    # Weights are the previous date's values, falling back to the current value
+    weights = values.shift(1).fillna(values).where(returns.notna()).fillna(0.0)
+    
+    # Dates without any value to weight by fall back to equal weights
+    unweighted = (weights.sum(axis=1) <= 0).to_numpy()[:, None]
+    weights = pd.DataFrame(np.where(unweighted, returns.notna().to_numpy(dtype='float64'), weights.to_numpy()),
+                           index=weights.index, columns=weights.columns)
+    weight_totals = weights.sum(axis=1)
+    combined_return = (returns.fillna(0.0) * weights).sum(axis=1) / weight_totals.where(weight_totals > 0)
+    combined_value = values.sum(axis=1, min_count=1)
+    
+    combined_df = pd.DataFrame({
+        'date': dates,
+        'value': combined_value.to_numpy(),
+        'return_pct': combined_return.to_numpy()
+    })
+    return combined_df, values
+
+
+def process_household_performance(performance_df, as_of=None):
+    """
+    Calculate combined performance metrics for all accounts of a household
+    
+    The accounts are merged with combine_account_series, the combined
+    series goes through the same metrics as a single account, and the
+    allocation is the value-weighted blend of the accounts' latest ones.
+    
+    Args:
+        performance_df: DataFrame containing performance data with an
+            'account_id' column
+        as_of: Reference date for the YTD/1y/3y/5y windows (optional,
+            defaults to now)
+        
+    Returns:
+        Dictionary with the metrics of process_account_performance plus the
+        household 'total_value' and each account's 'weight'
+    """
+    if performance_df.empty or 'date' not in performance_df.columns:
+        return {"error": "No performance data available"}
+    
+    df = performance_df.dropna(subset=['date']).copy()
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values(['account_id', 'date'], kind='mergesort')
+    combined_df, values = combine_account_series(df)
+    metrics = process_performance_batch(combined_df.assign(account_id=0), as_of=as_of).get(0, _default_metrics())
+    
+    # Latest value of every account, and the allocation blended by those values
+    latest_values = values.iloc[-1].fillna(0.0) if not values.empty else pd.Series(dtype='float64')
+    total_value = float(latest_values.sum())
+    allocation = dict(DEFAULT_ALLOCATION)
+    if 'asset_type' in df.columns and 'allocation_pct' in df.columns:
+        alloc_df = df.dropna(subset=['asset_type', 'allocation_pct'])
+        if not alloc_df.empty:
+            latest_date = alloc_df.groupby('account_id')['date'].transform('max')
+            latest_allocation = alloc_df[alloc_df['date'] == latest_date]
+            account_weights = latest_values.reindex(latest_allocation['account_id'].unique()).fillna(0.0)
+            if account_weights.sum() <= 0:
+                account_weights[:] = 1.0
+            row_weights = latest_allocation['account_id'].map(account_weights)
+            blended = (latest_allocation['allocation_pct'] * row_weights).groupby(latest_allocation['asset_type']).sum()
+            allocation = {asset: round(float(pct / account_weights.sum()), 2) for asset, pct in blended.items()}
+    
+    metrics["allocation"] = allocation
+    metrics["total_value"] = round(total_value, 2)
+    metrics["accounts"] = [
+        {
+            "account_id": account_id.item() if isinstance(account_id, np.generic) else account_id,
+            "value": round(float(value), 2),
+            "weight": round(float(value) / total_value * 100, 2) if total_value else 0.0
+        }
+        for account_id, value in latest_values.items()
+    ]
+    return metrics
+
+def lttb_indices(x, y, max_points):
+    """
+    Pick the points of a series to keep with Largest-Triangle-Three-Buckets downsampling
+    
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket, which preserves peaks
+    and troughs.
+    
+    Args:
+        x: Array of x coordinates in ascending order
+        y: Array of y coordinates
+        max_points: Maximum number of points to keep (None keeps all)
+        
+    Returns:
+        Sorted array of the positions to keep
+    """
+    n = len(x)
+    if max_points is None or n <= max_points or max_points < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    
+    # max_points - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        area = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    
+    return selected
+
+
+def _chart_series(dates, values, key, max_points):
+    """Build the chart points of one series, downsampled and with dates formatted in one pass"""
+    present = ~np.isnan(values)
+    dates, values = dates[present], values[present]
+    keep = lttb_indices(dates.astype('int64'), values, max_points)
+    labels = np.datetime_as_string(dates[keep], unit='D')
+    return [{"date": label, key: value} for label, value in zip(labels.tolist(), values[keep].tolist())]
+
+
+def generate_performance_chart_data(performance_df, max_points=None):
     """
     Generate data for performance charts
     
     Args:
         performance_df: DataFrame containing performance data
+        max_points: Maximum number of points per time series (optional);
+            longer series are reduced with LTTB downsampling
         
     Returns:
         Dictionary with chart data
@@ -162,31 +349,29 @@ def generate_performance_chart_data(performance_df):
     
     # Ensure date is datetime
     if 'date' in performance_df.columns:
+        performance_df = performance_df.dropna(subset=['date']).copy()
         performance_df['date'] = pd.to_datetime(performance_df['date'])
-        performance_df = performance_df.sort_values('date')
+        performance_df = performance_df.sort_values('date', kind='mergesort')
+        dates = performance_df['date'].to_numpy(dtype='datetime64[ns]')
     
     # Generate time series data for account value
     value_chart_data = []
     if 'date' in performance_df.columns and 'value' in performance_df.columns:
-        value_chart_data = [
-            {"date": date.strftime("%Y-%m-%d"), "value": value}
-            for date, value in zip(performance_df['date'], performance_df['value'])
-        ]
+        values = pd.to_numeric(performance_df['value'], errors='coerce').to_numpy(dtype='float64')
+        value_chart_data = _chart_series(dates, values, "value", max_points)
     
     # Generate time series data for returns
     return_chart_data = []
     if 'date' in performance_df.columns and 'return_pct' in performance_df.columns:
-        return_chart_data = [
-            {"date": date.strftime("%Y-%m-%d"), "return": ret}
-            for date, ret in zip(performance_df['date'], performance_df['return_pct'])
-        ]
+        returns = pd.to_numeric(performance_df['return_pct'], errors='coerce').to_numpy(dtype='float64')
+        return_chart_data = _chart_series(dates, returns, "return", max_points)
     
     # Generate current asset allocation
     allocation_data = []
     if 'asset_type' in performance_df.columns and 'allocation_pct' in performance_df.columns:
         # Take the most recent allocation
-        latest_date = performance_df['date'].max()
-        latest_allocation = performance_df[performance_df['date'] == latest_date]
+        alloc_df = performance_df.dropna(subset=['asset_type', 'allocation_pct'])
+        latest_allocation = alloc_df[alloc_df['date'] == alloc_df['date'].max()]
         allocation_data = [
             {"asset": asset, "percentage": pct}
             for asset, pct in zip(latest_allocation['asset_type'], latest_allocation['allocation_pct'])
@@ -197,3 +382,265 @@ def generate_performance_chart_data(performance_df):
         "return_chart": return_chart_data,
         "allocation_chart": allocation_data
     }
+
+
+# Named return windows served by ReturnIndex.period_window
+RETURN_PERIODS = ['mtd', 'qtd', 'ytd', '1y', '3y', '5y', 'inception']
+
+
+class ReturnIndex:
+    """
+    Precomputed cumulative return and running-max series for one account
+    
+    Built once from an account's performance rows, after which the return
+    of any date window is a binary search plus a prefix-sum difference, and
+    drawdowns of windows that start at inception are read off a prefix
+    minimum. Window returns use the same summed return_pct convention as
+    process_account_performance.
+    """
+    
+    def __init__(self, performance_df):
+        df = performance_df.dropna(subset=['date']).copy()
+        df['date'] = pd.to_datetime(df['date'])
+        df = df.sort_values('date', kind='mergesort')
+        
+        # Cumulative returns with a leading zero, so a window sum is cum[j] - cum[i]
+        return_df = df[df['return_pct'].notna()] if 'return_pct' in df.columns else df.iloc[0:0]
+        self.return_dates = return_df['date'].to_numpy(dtype='datetime64[ns]')
+        self.cumulative = np.concatenate(([0.0], np.cumsum(return_df['return_pct'].to_numpy(dtype='float64'))))
+        
+        # Values with their running maximum and the deepest drawdown seen so far
+        value_df = df[df['value'].notna()] if 'value' in df.columns else df.iloc[0:0]
+        self.value_dates = value_df['date'].to_numpy(dtype='datetime64[ns]')
+        self.values = value_df['value'].to_numpy(dtype='float64')
+        running_max = np.maximum.accumulate(self.values) if len(self.values) else self.values
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = np.where(running_max != 0, (self.values - running_max) / running_max, 0.0)
+        self.min_drawdown = np.minimum.accumulate(drawdown) if len(drawdown) else drawdown
+        
+        all_dates = np.concatenate((self.return_dates, self.value_dates))
+        self.first_date = pd.Timestamp(all_dates.min()) if len(all_dates) else None
+        self.last_date = pd.Timestamp(all_dates.max()) if len(all_dates) else None
+    
+    @property
+    def empty(self):
+        """True when the account has no dated performance rows"""
+        return self.first_date is None
+    
+    def _bounds(self, dates, start, end):
+        """Positions of the first row on or after start and just past the last row on or before end"""
+        lo = np.searchsorted(dates, np.datetime64(start, 'ns'), side='left') if start is not None else 0
+        hi = np.searchsorted(dates, np.datetime64(end, 'ns'), side='right') if end is not None else len(dates)
+        return lo, max(lo, hi)
+    
+    def _max_drawdown(self, lo, hi):
+        """Deepest drawdown in percent over value rows lo..hi-1"""
+        if hi - lo < 2:
+            return 0.0
+        if lo == 0:
+            return float(self.min_drawdown[hi - 1] * 100)
+        
+        window = self.values[lo:hi]
+        running_max = np.maximum.accumulate(window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = np.where(running_max != 0, (window - running_max) / running_max, 0.0)
+        return float(drawdown.min() * 100)
+    
+    def window(self, start=None, end=None):
+        """
+        Return and drawdown over a date window
+        
+        Args:
+            start: First date of the window, inclusive (optional, defaults to inception)
+            end: Last date of the window, inclusive (optional, defaults to the latest row)
+            
+        Returns:
+            Dictionary with the summed return, number of return observations,
+            max drawdown and the values at the edges of the window
+        """
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        
+        lo, hi = self._bounds(self.return_dates, start, end)
+        value_lo, value_hi = self._bounds(self.value_dates, start, end)
+        has_values = value_hi > value_lo
+        first = start if start is not None else self.first_date
+        last = end if end is not None else self.last_date
+
+        return {
+            "from": first.strftime('%Y-%m-%d') if first is not None else None,
+            "to": last.strftime('%Y-%m-%d') if last is not None else None,
+            "return_pct": round(float(self.cumulative[hi] - self.cumulative[lo]), 2),
+            "observations": int(hi - lo),
+            "max_drawdown": round(self._max_drawdown(value_lo, value_hi), 2),
+            "start_value": float(self.values[value_lo]) if has_values else None,
+            "end_value": float(self.values[value_hi - 1]) if has_values else None
+        }
+    
+    def period_window(self, period, as_of=None):
+        """
+        Return and drawdown over a named period ending at as_of
+        
+        Args:
+            period: One of RETURN_PERIODS
+            as_of: Reference date (optional, defaults to now)
+            
+        Returns:
+            Window dictionary as returned by window(), with a 'period' key
+            
+        Raises:
+            ValueError: If the period name is unknown
+        """
+        current_date = pd.Timestamp(as_of or datetime.now())
+        starts = {
+            'mtd': current_date.replace(day=1),
+            'qtd': current_date.replace(month=3 * ((current_date.month - 1) // 3) + 1, day=1),
+            'ytd': current_date.replace(month=1, day=1),
+            '1y': current_date - timedelta(days=365),
+            '3y': current_date - timedelta(days=365*3),
+            '5y': current_date - timedelta(days=365*5),
+            'inception': None
+        }
+        if period not in starts:
+            raise ValueError(f"Unknown return period: {period}")
+        
+        start = starts[period]
+        if start is not None:
+            start = start.normalize() if period in ('mtd', 'qtd', 'ytd') else start
+        result = self.window(start, current_date)
+        result["period"] = period
+        return result
+
+
+# Assumptions used when there is too little return history to estimate them
+DEFAULT_ANNUAL_RETURN = 6.0
+DEFAULT_ANNUAL_VOLATILITY = 12.0
+
+# Limits that keep the cost of a projection bounded
+MAX_PROJECTION_PATHS = 10000
+MAX_PROJECTION_MONTHS = 1200
+MAX_PROJECTION_CELLS = 2000000
+
+# Percentiles reported for projected balances
+PROJECTION_PERCENTILES = [10, 25, 50, 75, 90]
+
+
+def estimate_return_assumptions(performance_df):
+    """
+    Estimate annualized return and volatility from a return series
+    
+    The observation frequency is inferred from the median spacing of the
+    dates, so monthly and daily histories are both annualized correctly.
+    
+    Args:
+        performance_df: DataFrame with 'date' and 'return_pct' columns
+        
+    Returns:
+        Dictionary with annual_return and annual_volatility in percent, the
+        number of observations, and whether the figures were estimated or
+        are the defaults
+    """
+    if performance_df.empty or not {'date', 'return_pct'} <= set(performance_df.columns):
+        df = pd.DataFrame(columns=['date', 'return_pct'])
+    else:
+        df = performance_df.dropna(subset=['date', 'return_pct'])
+    
+    if len(df) < 3:
+        return {
+            "annual_return": DEFAULT_ANNUAL_RETURN,
+            "annual_volatility": DEFAULT_ANNUAL_VOLATILITY,
+            "observations": len(df),
+            "estimated": False
+        }
+    
+    dates = pd.to_datetime(df['date']).sort_values()
+    spacing_days = max(dates.diff().dt.days.median(), 1)
+    periods_per_year = 365.25 / spacing_days
+    returns = df['return_pct'].astype('float64')
+    
+    return {
+        "annual_return": round(float(returns.mean() * periods_per_year), 4),
+        "annual_volatility": round(float(returns.std() * np.sqrt(periods_per_year)), 4),
+        "observations": len(df),
+        "estimated": True
+    }
+
+
+def simulate_goal_projection(current_amount, target_amount, months, annual_return, annual_volatility,
+                             paths=5000, seed=None, monthly_contribution=0.0, start_date=None):
+    """
+    Project a goal balance with Monte Carlo simulation of monthly returns
+    
+    Monthly growth factors are drawn lognormally from the annual return and
+    volatility for all paths at once. With a contribution c added at the
+    start of each month and P_m the cumulative growth after m months, the
+    balance is P_m * (current + c * sum(1 / P_k for k < m)), which is
+    computed for every path and month with cumulative sums. The number of
+    paths is capped so paths x months stays within MAX_PROJECTION_CELLS.
+    
+    Args:
+        current_amount: Starting balance
+        target_amount: Balance the goal needs to reach
+        months: Number of months until the target date
+        annual_return: Expected annual return in percent
+        annual_volatility: Annual volatility in percent
+        paths: Number of simulated paths (optional)
+        seed: Seed of the random generator, for reproducible results (optional)
+        monthly_contribution: Amount added at the start of every month (optional)
+        start_date: Date of month 0 (optional, defaults to today)
+        
+    Returns:
+        Dictionary with the success probability, terminal balance percentiles
+        and yearly percentile bands
+    """
+    months = min(max(int(months), 0), MAX_PROJECTION_MONTHS)
+    paths = max(1, min(int(paths), MAX_PROJECTION_PATHS, MAX_PROJECTION_CELLS // max(months, 1)))
+    rng = np.random.default_rng(seed)
+    current_amount = float(current_amount or 0.0)
+    
+    mu = annual_return / 100
+    sigma = annual_volatility / 100
+    dt = 1 / 12
+    
+    balances = np.full((months + 1, paths), current_amount)
+    if months:
+        # Cumulative growth P_1..P_months, built in place
+        growth = rng.normal((mu - 0.5 * sigma ** 2) * dt, sigma * np.sqrt(dt), size=(months, paths))
+        np.cumsum(growth, axis=0, out=growth)
+        np.exp(growth, out=growth)
+        
+        if monthly_contribution:
+            # Contributions compound from the month they are paid in: 1/P_0 + ... + 1/P_{m-1}
+            discounted = np.empty_like(growth)
+            discounted[0] = 1.0
+            np.divide(1.0, growth[:-1], out=discounted[1:])
+            np.cumsum(discounted, axis=0, out=discounted)
+            balances[1:] = growth * (current_amount + monthly_contribution * discounted)
+        else:
+            balances[1:] = growth * current_amount
+    
+    bands = np.percentile(balances, PROJECTION_PERCENTILES, axis=1)
+    terminal = balances[-1]
+    
+    # One band point per year plus the target month
+    band_months = list(range(0, months + 1, 12))
+    if band_months[-1] != months:
+        band_months.append(months)
+    start = pd.Timestamp(start_date or datetime.now()).normalize()
+    band_dates = [(start + pd.DateOffset(months=month)).strftime('%Y-%m-%d') for month in band_months]
+    
+    return {
+        "paths": paths,
+        "horizon_months": months,
+        "seed": seed,
+        "success_probability": round(float((terminal >= target_amount).mean() * 100), 2),
+        "expected_terminal_value": round(float(terminal.mean()), 2),
+        "terminal_percentiles": {
+            f"p{pct}": round(float(value), 2) for pct, value in zip(PROJECTION_PERCENTILES, bands[:, -1])
+        },
+        "bands": [
+            dict({"month": month, "date": band_date},
+                 **{f"p{pct}": round(float(bands[i, month]), 2) for i, pct in enumerate(PROJECTION_PERCENTILES)})
+            for month, band_date in zip(band_months, band_dates)
+        ]
+    }
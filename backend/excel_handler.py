@@ -1,8 +1,19 @@
 import pandas as pd
 import numpy as np
+import io
+import itertools
 import os
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from openpyxl import load_workbook, Workbook
 
+# Number of rows per chunk when streaming large workbooks
+EXCEL_CHUNK_SIZE = 10000
+
+# Number of worker processes used to parse sheets in parallel
+PARSE_WORKERS = int(os.environ.get("IMPORT_PARSE_WORKERS", os.cpu_count() or 1))
+
 def read_excel_file(file_path, sheet_name=None):
     """
     Read data from an Excel file
@@ -66,10 +77,336 @@ def get_excel_sheet_names(file_path):
         if file_path.endswith('.csv'):
             return ["Sheet1"]  # CSV files have only one sheet
         
-        # For Excel files, return all sheet names
-        return pd.ExcelFile(file_path).sheet_names
+        if file_path.endswith('.xls'):
+            return pd.ExcelFile(file_path).sheet_names
+        
+        # For Excel files, return all sheet names without loading any cells
+        workbook = load_workbook(file_path, read_only=True)
+        try:
+            return workbook.sheetnames
+        finally:
+            workbook.close()
+    except Exception as e:
+        raise Exception(f"Error reading Excel file: {str(e)}")
+
+def _rows_to_frame(rows, columns, positions):
+    """
+    Build a DataFrame from row tuples, padding or trimming them to the header width
+    
+    The index holds each row's position below the header row of the sheet.
+    """
+    width = len(columns)
+    padded = [row[:width] + (None,) * (width - len(row)) for row in rows]
+    return pd.DataFrame.from_records(padded, columns=columns, index=pd.Index(positions))
+
+def iter_excel_chunks(file_path, chunk_size=EXCEL_CHUNK_SIZE, sheet_names=None):
+    """
+    Stream the sheets of an Excel file as fixed-size DataFrame chunks
+    
+    The workbook is opened once in openpyxl read-only mode and rows are
+    pulled lazily, so memory use depends on chunk_size rather than on the
+    size of the file.
+    
+    Args:
+        file_path: Path to the Excel file
+        chunk_size: Maximum number of rows per chunk
+        sheet_names: Sheets to read, in this order, or a function that gets
+            the workbook's sheet names and returns them (optional, defaults
+            to all sheets in workbook order); a function lets the caller
+            choose sheets without opening the workbook a second time
+        
+    Yields:
+        Tuples of (sheet name, DataFrame chunk) using the first row of each
+        sheet as column names and the row position in the sheet as index
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    if file_path.endswith('.xls'):
+        # openpyxl cannot stream legacy .xls files, so slice them in memory
+        sheets = read_excel_file(file_path, None)
+        if callable(sheet_names):
+            sheet_names = sheet_names(list(sheets))
+        for sheet_name in sheet_names if sheet_names is not None else list(sheets):
+            df = sheets[sheet_name]
+            for start in range(0, len(df), chunk_size):
+                yield sheet_name, df.iloc[start:start + chunk_size]
+        return
+    
+    try:
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
     except Exception as e:
         raise Exception(f"Error reading Excel file: {str(e)}")
+    
+    try:
+        if callable(sheet_names):
+            sheet_names = sheet_names(workbook.sheetnames)
+        # Read-only workbooks open sheets in any order at no extra cost
+        worksheets = [workbook[name] for name in sheet_names] if sheet_names is not None else workbook.worksheets
+        for worksheet in worksheets:
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            columns = [str(name).strip() if name is not None else f"Unnamed: {i}"
+                       for i, name in enumerate(header)]
+            
+            batch = []
+            positions = []
+            for position, row in enumerate(rows):
+                # Skip blank rows left behind by formatting
+                if all(value is None for value in row):
+                    continue
+                batch.append(row)
+                positions.append(position)
+                if len(batch) >= chunk_size:
+                    yield worksheet.title, _rows_to_frame(batch, columns, positions)
+                    batch = []
+                    positions = []
+            
+            if batch:
+                yield worksheet.title, _rows_to_frame(batch, columns, positions)
+    finally:
+        workbook.close()
+
+def iter_csv_chunks(file_path, chunk_size=EXCEL_CHUNK_SIZE, start_offset=0, start_row=0):
+    """
+    Stream a CSV file as fixed-size DataFrame chunks
+    
+    Chunks are cut from the raw bytes at record boundaries and parsed with
+    the header line put in front, so an interrupted import resumes by
+    seeking to the byte offset after its last committed chunk rather than
+    reading every committed row again.
+    
+    Args:
+        file_path: Path to the CSV file
+        chunk_size: Maximum number of lines per chunk
+        start_offset: Byte offset of the first data row to read (optional,
+            defaults to the row after the header)
+        start_row: Position below the header of the row at start_offset,
+            used to number the rows of a resumed import
+        
+    Yields:
+        Tuples of (DataFrame chunk indexed by each row's position below the
+        header, byte offset just after the chunk)
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.readline()
+            f.seek(start_offset or len(header))
+            offset = f.tell()
+            row = start_row
+            while True:
+                block = b''.join(itertools.islice(f, chunk_size))
+                if not block:
+                    break
+                # A quoted field spanning lines leaves an odd number of quotes; finish its record
+                while block.count(b'"') % 2:
+                    line = f.readline()
+                    if not line:
+                        break
+                    block += line
+                offset += len(block)
+                
+                chunk = pd.read_csv(io.BytesIO(header + block))
+                chunk.index = pd.RangeIndex(row, row + len(chunk))
+                row += len(chunk)
+                yield chunk, offset
+    except Exception as e:
+        raise Exception(f"Error reading CSV file: {str(e)}")
+
+def _parquet_members(archive):
+    """Map sheet names to member names for the .parquet files inside a zip archive"""
+    return {os.path.splitext(os.path.basename(name))[0]: name
+            for name in archive.namelist() if name.endswith('.parquet')}
+
+def read_parquet_file(file_path, sheet_name=None):
+    """
+    Read data from a Parquet file or a zip archive of per-sheet Parquet files
+    
+    Archives hold one '<sheet name>.parquet' member per sheet, the columnar
+    equivalent of a multi-sheet workbook.
+    
+    Args:
+        file_path: Path to the .parquet file or .zip archive
+        sheet_name: Name of the sheet to read from an archive (optional)
+        
+    Returns:
+        DataFrame for a single file or sheet, otherwise a dictionary mapping
+        sheet names to DataFrames
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    try:
+        if not file_path.endswith('.zip'):
+            return pd.read_parquet(file_path)
+        
+        with zipfile.ZipFile(file_path) as archive:
+            members = _parquet_members(archive)
+            if sheet_name:
+                with archive.open(members[sheet_name]) as member:
+                    return pd.read_parquet(member)
+            
+            data = {}
+            for name, member_name in members.items():
+                with archive.open(member_name) as member:
+                    data[name] = pd.read_parquet(member)
+            return data
+    except Exception as e:
+        raise Exception(f"Error reading Parquet file: {str(e)}")
+
+def write_parquet_file(file_path, data_dict, schemas=None):
+    """
+    Write data to a zip archive holding one Parquet file per sheet
+    
+    Args:
+        file_path: Path to write the .zip archive
+        data_dict: Dictionary mapping sheet names to a DataFrame, or to an
+            iterable of DataFrame chunks written as successive row groups
+        schemas: Dictionary mapping sheet names to pyarrow schemas (optional),
+            needed to keep column types stable across chunks
+        
+    Returns:
+        Path to the written file
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schemas = schemas or {}
+    try:
+        # Parquet pages are already compressed, so members are stored as-is
+        with zipfile.ZipFile(file_path, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for sheet_name, frames in data_dict.items():
+                if isinstance(frames, pd.DataFrame):
+                    frames = [frames]
+                
+                with archive.open(f"{sheet_name}.parquet", 'w', force_zip64=True) as member:
+                    writer = None
+                    try:
+                        for df in frames:
+                            table = pa.Table.from_pandas(df, schema=schemas.get(sheet_name), preserve_index=False)
+                            if writer is None:
+                                writer = pq.ParquetWriter(member, table.schema, compression='zstd')
+                            writer.write_table(table)
+                        if writer is None and sheet_name in schemas:
+                            # Keep empty sheets so the archive always has the same members
+                            writer = pq.ParquetWriter(member, schemas[sheet_name], compression='zstd')
+                    finally:
+                        if writer is not None:
+                            writer.close()
+        return file_path
+    except Exception as e:
+        raise Exception(f"Error writing Parquet file: {str(e)}")
+
+def get_parquet_sheet_names(file_path):
+    """
+    Get list of sheet names from a Parquet file or archive
+    
+    Args:
+        file_path: Path to the .parquet file or .zip archive
+        
+    Returns:
+        List of sheet names; a single .parquet file is named after the file
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    if not file_path.endswith('.zip'):
+        return [os.path.splitext(os.path.basename(file_path))[0]]
+    
+    with zipfile.ZipFile(file_path) as archive:
+        return list(_parquet_members(archive))
+
+def iter_parquet_chunks(file_path, chunk_size=EXCEL_CHUNK_SIZE, sheet_names=None):
+    """
+    Stream a Parquet file, or the sheets of a Parquet archive, as DataFrame chunks
+    
+    Args:
+        file_path: Path to the .parquet file or .zip archive
+        chunk_size: Maximum number of rows per chunk
+        sheet_names: Sheets to read from an archive, in this order (optional,
+            defaults to all sheets in archive order)
+        
+    Yields:
+        Tuples of (sheet name, DataFrame chunk) indexed by row position
+    """
+    import pyarrow.parquet as pq
+    
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    def read_batches(name, source):
+        start = 0
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            df = batch.to_pandas()
+            df.index = pd.RangeIndex(start, start + len(df))
+            start += len(df)
+            yield name, df
+    
+    if not file_path.endswith('.zip'):
+        yield from read_batches(get_parquet_sheet_names(file_path)[0], file_path)
+        return
+    
+    with zipfile.ZipFile(file_path) as archive:
+        members = _parquet_members(archive)
+        for name in sheet_names or list(members):
+            with archive.open(members[name]) as member:
+                yield from read_batches(name, member)
+
+def read_sheet_columns(file_path, sheet_name):
+    """
+    Parse a single sheet into compact column arrays
+    
+    Runs in a worker process when sheets are parsed in parallel, so it only
+    returns plain NumPy arrays that are cheap to pickle back to the parent.
+    
+    Args:
+        file_path: Path to the Excel file
+        sheet_name: Name of the sheet to parse
+        
+    Returns:
+        Tuple of (array of row positions in the sheet, dictionary mapping
+        column names to NumPy arrays); the positions are the index streamed
+        chunks carry, so invalid cells are reported on the same rows
+    """
+    chunks = [chunk for _, chunk in iter_excel_chunks(file_path, sheet_names=[sheet_name])]
+    if not chunks:
+        return np.empty(0, dtype='int64'), {}
+    
+    # Blank rows were skipped, so the positions are not a plain range
+    df = pd.concat(chunks).infer_objects()
+    return df.index.to_numpy(), {column: df[column].to_numpy() for column in df.columns}
+
+def read_sheets_parallel(file_path, sheet_names, max_workers=None):
+    """
+    Parse several sheets of an Excel file at once in worker processes
+    
+    Args:
+        file_path: Path to the Excel file
+        sheet_names: Sheets to parse
+        max_workers: Maximum number of worker processes (optional)
+        
+    Returns:
+        Dictionary mapping sheet names to their (row positions, column arrays)
+        tuples from read_sheet_columns
+    """
+    if not sheet_names:
+        return {}
+    
+    workers = min(len(sheet_names), max_workers or PARSE_WORKERS)
+    
+    # Spawned workers start a fresh interpreter: they re-import the parent's main
+    # script (app_entry.py or app.py) as __mp_main__ and then this module. The
+    # app must therefore stay free of side effects on import; its engine opens
+    # no connection until used and the metrics scheduler starts on the first request
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {sheet: pool.submit(read_sheet_columns, file_path, sheet) for sheet in sheet_names}
+        return {sheet: future.result() for sheet, future in futures.items()}
 
 def create_sample_excel():
     """
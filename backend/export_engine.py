@@ -0,0 +1,209 @@
+"""
+Bulk Export Engine for Financial Advisor Platform
+
+This module reads whole tables in chunks with Core selects and writes them
+out in bulk export formats.
+"""
+
+import csv
+import io
+import json
+import pandas as pd
+from datetime import datetime
+from openpyxl import Workbook
+from sqlalchemy import select, Integer, BigInteger, Float, DateTime
+
+from app import db
+from excel_handler import write_parquet_file
+from models import Household, Account, Activity, Performance
+
+# Tables exported for the book of business, in FK-safe order, with their sheet names
+EXPORT_TABLES = [
+    ('Households', Household),
+    ('Accounts', Account),
+    ('Activities', Activity),
+    ('Performance', Performance),
+]
+
+# Number of rows fetched from the database per chunk
+EXPORT_CHUNK_SIZE = 10000
+
+# Internal bookkeeping columns left out of exports
+EXCLUDED_COLUMNS = {'row_hash'}
+
+
+def export_columns(model):
+    """Return the table columns of a model that are included in exports"""
+    return [column for column in model.__table__.columns if column.name not in EXCLUDED_COLUMNS]
+
+
+def resolve_export_tables(names=None):
+    """
+    Select the export tables matching a list of table or sheet names
+
+    Args:
+        names: Iterable of names such as 'households' or 'Performance' (optional,
+            defaults to all tables)
+
+    Returns:
+        List of (sheet name, model) pairs in FK-safe order
+
+    Raises:
+        ValueError: If a name does not match any exported table
+    """
+    if not names:
+        return list(EXPORT_TABLES)
+
+    wanted = set()
+    for name in names:
+        key = name.strip().lower()
+        matches = [sheet for sheet, model in EXPORT_TABLES
+                   if key in (sheet.lower(), model.__tablename__) or (key == 'clients' and model is Household)]
+        if not matches:
+            raise ValueError(f"Unknown export table: {name}")
+        wanted.update(matches)
+    return [(sheet, model) for sheet, model in EXPORT_TABLES if sheet in wanted]
+
+
+def iter_table_rows(model, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Read a whole table through a server-side cursor, one partition at a time
+
+    Args:
+        model: SQLAlchemy model class
+        chunk_size: Number of rows fetched per partition
+
+    Yields:
+        Lists of up to chunk_size row tuples, ordered by ID
+    """
+    stmt = select(*export_columns(model)).order_by(model.id).execution_options(yield_per=chunk_size)
+    for rows in db.session.execute(stmt).partitions():
+        yield rows
+
+
+def _plain_value(value):
+    """Convert a column value to a text-friendly form, with datetimes in ISO format"""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def stream_csv(model, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream a table as CSV text
+
+    Args:
+        model: SQLAlchemy model class
+        chunk_size: Number of rows per yielded block
+
+    Yields:
+        CSV text blocks, starting with the header line
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in export_columns(model)])
+
+    for rows in iter_table_rows(model, chunk_size):
+        writer.writerows([_plain_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(tables, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream tables as newline-delimited JSON, one object per row
+
+    Args:
+        tables: List of (sheet name, model) pairs
+        chunk_size: Number of rows per yielded block
+
+    Yields:
+        Blocks of JSON lines; every object carries a 'table' key with the sheet name
+    """
+    for sheet, model in tables:
+        names = [column.name for column in export_columns(model)]
+        for rows in iter_table_rows(model, chunk_size):
+            lines = []
+            for row in rows:
+                record = {'table': sheet}
+                record.update(zip(names, row))
+                lines.append(json.dumps(record, default=_plain_value))
+            yield '\n'.join(lines) + '\n'
+
+
+def export_xlsx(file_path, tables=None):
+    """
+    Export tables to an Excel workbook in openpyxl write-only mode
+
+    Rows are streamed to the file as they are fetched, so memory use does
+    not grow with the size of the tables.
+
+    Args:
+        file_path: Path to write the .xlsx file
+        tables: List of (sheet name, model) pairs (optional, defaults to all)
+
+    Returns:
+        Path to the written file
+    """
+    workbook = Workbook(write_only=True)
+    for sheet, model in tables or EXPORT_TABLES:
+        worksheet = workbook.create_sheet(title=sheet)
+        worksheet.append([column.name for column in export_columns(model)])
+        for rows in iter_table_rows(model):
+            for row in rows:
+                worksheet.append(list(row))
+    workbook.save(file_path)
+    return file_path
+
+
+def iter_table_frames(model, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Read a whole table as DataFrame chunks without loading it all at once
+
+    Args:
+        model: SQLAlchemy model class
+        chunk_size: Number of rows per chunk
+
+    Yields:
+        DataFrames of up to chunk_size rows, ordered by ID
+    """
+    names = [column.name for column in export_columns(model)]
+    for rows in iter_table_rows(model, chunk_size):
+        yield pd.DataFrame.from_records(rows, columns=names)
+
+
+def arrow_schema(model):
+    """Build the pyarrow schema matching the exported columns of a model"""
+    import pyarrow as pa
+
+    fields = []
+    for column in export_columns(model):
+        if isinstance(column.type, (Integer, BigInteger)):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp('us')
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+def export_parquet(file_path, tables=None):
+    """
+    Export tables as a zip archive of per-sheet Parquet files
+
+    Args:
+        file_path: Path to write the .zip archive
+        tables: List of (sheet name, model) pairs (optional, defaults to all)
+
+    Returns:
+        Path to the written file
+    """
+    tables = tables or EXPORT_TABLES
+    data = {sheet: iter_table_frames(model) for sheet, model in tables}
+    schemas = {sheet: arrow_schema(model) for sheet, model in tables}
+    return write_parquet_file(file_path, data, schemas)
@@ -0,0 +1,94 @@
+"""
+Household Snapshots for Financial Advisor Platform
+
+This module loads households together with their accounts, goals, recent
+activities and latest account metrics. The number of queries is fixed,
+whatever the number of households and accounts, so a client screen needs a
+single request instead of one per household and account.
+"""
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload
+
+from app import db
+from metrics_snapshots import latest_account_metrics
+from models import Household, Activity
+from serializers import RECORD_FIELDS, record_columns, to_records
+
+# Recent activities returned per account unless the request asks for another number
+RECENT_ACTIVITY_COUNT = 10
+
+# Upper limit of recent activities per account
+MAX_RECENT_ACTIVITIES = 100
+
+# Upper limit of households in one bulk snapshot request
+MAX_SNAPSHOT_HOUSEHOLDS = 100
+
+
+def load_recent_activities(account_ids, per_account=RECENT_ACTIVITY_COUNT):
+    """
+    Load the newest activities of many accounts with a single windowed query
+
+    Args:
+        account_ids: Iterable of account IDs
+        per_account: Number of activities per account
+
+    Returns:
+        Dictionary mapping account_id to its activity records, newest first
+    """
+    account_ids = list(account_ids)
+    if not account_ids or per_account <= 0:
+        return {}
+
+    rank = func.row_number().over(
+        partition_by=Activity.account_id,
+        order_by=(Activity.date.desc(), Activity.id.desc())
+    ).label('rank')
+    ranked = select(*record_columns(Activity), rank).where(Activity.account_id.in_(account_ids)).subquery()
+    stmt = select(*[ranked.c[field] for field in RECORD_FIELDS[Activity]]) \
+        .where(ranked.c.rank <= per_account) \
+        .order_by(ranked.c.account_id, ranked.c.date.desc(), ranked.c.id.desc())
+
+    activities = {}
+    for record in to_records(Activity, db.session.execute(stmt)):
+        activities.setdefault(record['account_id'], []).append(record)
+    return activities
+
+
+def load_household_snapshots(household_ids, recent_activities=RECENT_ACTIVITY_COUNT):
+    """
+    Build the snapshots of several households
+
+    Accounts and goals are eager-loaded with selectinload; activities and
+    metrics are loaded for all accounts at once.
+
+    Args:
+        household_ids: Iterable of household IDs
+        recent_activities: Number of recent activities per account
+
+    Returns:
+        Tuple of the snapshots keyed by household ID (unknown IDs are left
+        out), the metrics snapshots used and the number of accounts whose
+        metrics were computed live
+    """
+    households = Household.query \
+        .options(selectinload(Household.accounts), selectinload(Household.financial_goals)) \
+        .filter(Household.id.in_([int(household_id) for household_id in household_ids])) \
+        .all()
+
+    account_ids = [account.id for household in households for account in household.accounts]
+    activities = load_recent_activities(account_ids, recent_activities)
+    metrics, snapshots, live_count = latest_account_metrics(account_ids) if account_ids else ({}, [], 0)
+
+    household_snapshots = {}
+    for household in households:
+        snapshot = household.to_dict()
+        snapshot['accounts'] = []
+        for account in sorted(household.accounts, key=lambda account: account.id):
+            account_dict = account.to_dict()
+            account_dict['metrics'] = metrics.get(account.id)
+            account_dict['recent_activities'] = activities.get(account.id, [])
+            snapshot['accounts'].append(account_dict)
+        snapshot['goals'] = [goal.to_dict() for goal in sorted(household.financial_goals, key=lambda goal: goal.id)]
+        household_snapshots[household.id] = snapshot
+    return household_snapshots, snapshots, live_count
@@ -0,0 +1,98 @@
+"""
+Conditional GET Support for Financial Advisor Platform
+
+This module derives ETag and Last-Modified validators from the row count and
+latest updated_at of the rows behind a resource. Both come from one
+aggregate query, so a client whose copy is still current gets a 304 answer
+without the rows being loaded or serialized.
+"""
+
+import hashlib
+from datetime import datetime, time
+from flask import current_app, request
+from sqlalchemy import func
+
+from app import db
+
+
+def table_state(model, *criteria, column=None):
+    """
+    Return the row count and latest modification time of matching rows
+
+    Args:
+        model: Model class
+        *criteria: Filter expressions
+        column: Timestamp column (optional, defaults to model.updated_at)
+
+    Returns:
+        Tuple of (count, latest timestamp or None)
+    """
+    column = column if column is not None else model.updated_at
+    count, latest = db.session.query(func.count(), func.max(column)).select_from(model).filter(*criteria).one()
+    return count, latest
+
+
+def resource_validators(*states, daily=False):
+    """
+    Build the ETag and Last-Modified of a resource from table states
+
+    Row counts are part of the ETag, so deleted rows change it; Last-Modified
+    only follows the timestamps and cannot see deletions.
+
+    Args:
+        *states: Tuples from table_state
+        daily: The representation also changes at midnight UTC, e.g. because
+            it contains a day count
+
+    Returns:
+        Tuple of (etag, last_modified)
+    """
+    last_modified = max((latest for _, latest in states if latest is not None), default=None)
+    key = repr(states)
+    if daily:
+        today = datetime.utcnow().date()
+        midnight = datetime.combine(today, time.min)
+        last_modified = max(last_modified, midnight) if last_modified is not None else midnight
+        key += today.isoformat()
+    return hashlib.sha1(key.encode()).hexdigest(), last_modified
+
+
+def _set_validators(response, etag, last_modified):
+    """Attach the validators and make clients revalidate before reusing their copy"""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def conditional_response(validators, build):
+    """
+    Answer 304 when the client's copy is current, otherwise build the response
+
+    If-None-Match takes precedence over If-Modified-Since.
+
+    Args:
+        validators: Tuple of (etag, last_modified) from resource_validators
+        build: Function without arguments that returns the full response;
+            only successful responses get the validators
+
+    Returns:
+        Response object
+    """
+    etag, last_modified = validators
+    if request.if_none_match:
+        unmodified = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified is not None:
+        # HTTP dates have whole seconds; If-Modified-Since is parsed as aware UTC
+        unmodified = last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    else:
+        unmodified = False
+
+    if unmodified:
+        return _set_validators(current_app.response_class(status=304), etag, last_modified)
+
+    response = build()
+    if isinstance(response, tuple) or response.status_code != 200:
+        return response
+    return _set_validators(response, etag, last_modified)
@@ -0,0 +1,846 @@
+"""
+Bulk Import Engine for Financial Advisor Platform
+
+This module converts imported sheets column-wise and writes them to the
+database with batched Core inserts, skipping rows whose IDs already exist.
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime, date
+from sqlalchemy import select, bindparam
+
+from app import db
+from excel_handler import (iter_excel_chunks, iter_csv_chunks, iter_parquet_chunks, get_excel_sheet_names,
+                           get_parquet_sheet_names, read_sheets_parallel)
+from models import Household, Account, Activity, Performance, ImportCheckpoint, ImportedFile
+from queries import get_data_version, bump_data_version
+from account_stats import update_account_stats
+from metrics_snapshots import carry_forward_snapshots
+from metrics_cache import bump_account_versions
+
+# Number of rows sent to the database per executemany call
+INSERT_BATCH_SIZE = 5000
+
+# Appended to the ImportedFile target of delta imports, which overwrite existing rows
+DELTA_TARGET_SUFFIX = ':delta'
+
+# Number of IDs bound per lookup query, under SQLite's default limit of 999 parameters
+ID_LOOKUP_BATCH_SIZE = 900
+
+# Number of CSV rows read, inserted and committed together
+CSV_CHUNK_SIZE = 50000
+
+# Column mapping for each importable table.
+# Every target column lists the source columns it may come from (the first
+# one present in the sheet wins), how the values are converted, and the
+# value used when none of the source columns exist.
+TABLE_SPECS = {
+    'households': {
+        'model': Household,
+        'sheets': ('clients', 'households'),
+        'columns': {
+            'id': (('client_id', 'household_id', 'id'), 'int', None),
+            'name': (('name',), 'str', ''),
+            'email': (('email',), 'str', ''),
+            'phone': (('phone',), 'str', ''),
+            'birth_date': (('birth_date',), 'date', None),
+            'risk_profile': (('risk_profile',), 'str', ''),
+            'segment': (('segment',), 'str', ''),
+            'total_assets': (('total_assets',), 'float', 0),
+        },
+        'required': {'name': ''},
+    },
+    'accounts': {
+        'model': Account,
+        'sheets': ('accounts',),
+        'columns': {
+            'id': (('account_id', 'id'), 'int', None),
+            'household_id': (('client_id', 'household_id'), 'int', None),
+            'account_type': (('account_type',), 'str', ''),
+            'opening_date': (('opening_date',), 'date', None),
+            'current_balance': (('current_balance',), 'float', 0),
+            'currency': (('currency',), 'str', 'USD'),
+        },
+        'required': {},
+    },
+    'activities': {
+        'model': Activity,
+        'sheets': ('activities',),
+        'columns': {
+            'id': (('activity_id', 'id'), 'int', None),
+            'account_id': (('account_id',), 'int', None),
+            'date': (('date',), 'date', None),
+            'type': (('type',), 'str', ''),
+            'description': (('description',), 'str', ''),
+            'amount': (('amount',), 'float', 0),
+        },
+        'required': {'date': 'now'},
+    },
+    'performance': {
+        'model': Performance,
+        'sheets': ('performance',),
+        'columns': {
+            'id': (('record_id', 'id'), 'int', None),
+            'account_id': (('account_id',), 'int', None),
+            'date': (('date',), 'date', None),
+            'value': (('value',), 'float', None),
+            'return_pct': (('return_pct',), 'float', None),
+            'asset_type': (('asset_type',), 'str', None),
+            'allocation_pct': (('allocation_pct',), 'float', None),
+        },
+        'required': {'date': 'now'},
+    },
+}
+
+# Order in which tables must be written so foreign keys always resolve
+TABLE_ORDER = ['households', 'accounts', 'activities', 'performance']
+
+# Candidate formats tried, in order, when inferring the format of a date column
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%Y/%m/%d',
+    '%m-%d-%Y',
+    '%d-%m-%Y',
+    '%d.%m.%Y',
+    '%b %d, %Y',
+    '%d %b %Y',
+]
+
+# Number of non-empty cells sampled to infer a date format
+DATE_SAMPLE_SIZE = 200
+
+# Maximum number of invalid cells kept for an import error report
+MAX_REPORTED_CELLS = 1000
+
+
+class ImportDataError(ValueError):
+    """Raised after an import when cells could not be converted, listing all of them"""
+
+    def __init__(self, invalid_cells, invalid_count):
+        self.invalid_cells = invalid_cells
+        self.invalid_count = invalid_count
+        examples = ', '.join(
+            f"{cell['sheet']} row {cell['row']} {cell['column']}={cell['value']!r}"
+            for cell in invalid_cells[:5]
+        )
+        super().__init__(f"{invalid_count} cell(s) could not be parsed as dates or integer IDs: {examples}")
+
+
+class InvalidCellCollector:
+    """Collects unparseable cells across all sheets of an import"""
+
+    def __init__(self):
+        self.cells = []
+        self.count = 0
+
+    def add(self, sheet, column, values):
+        """Record invalid values; values is a Series indexed by sheet row position"""
+        self.count += len(values)
+        room = MAX_REPORTED_CELLS - len(self.cells)
+        for position, value in values.head(max(room, 0)).items():
+            # Row numbers match the spreadsheet: header on row 1, data from row 2
+            self.cells.append({'sheet': sheet, 'row': int(position) + 2, 'column': column, 'value': str(value)})
+
+    def raise_if_any(self):
+        """Raise ImportDataError if any invalid cell was recorded"""
+        if self.count:
+            raise ImportDataError(self.cells, self.count)
+
+
+def new_import_count():
+    """Return an empty import counter keyed by table name"""
+    return {table: 0 for table in TABLE_ORDER}
+
+
+def table_for_sheet(sheet_name):
+    """
+    Map a sheet name to the table it is imported into
+
+    Args:
+        sheet_name: Name of the sheet in the uploaded workbook
+
+    Returns:
+        Table key from TABLE_SPECS, or None if the sheet is not importable
+    """
+    name = str(sheet_name).strip().lower()
+    for table, spec in TABLE_SPECS.items():
+        if name in spec['sheets']:
+            return table
+    return None
+
+
+def infer_date_format(text_values):
+    """
+    Infer the strftime format of a column of date strings from a sample
+
+    Args:
+        text_values: Series of non-empty date strings
+
+    Returns:
+        The format in DATE_FORMATS that parses most of the sample, or None
+    """
+    sample = text_values.head(DATE_SAMPLE_SIZE)
+    best_format, best_matches = None, 0
+    for date_format in DATE_FORMATS:
+        matches = pd.to_datetime(sample, format=date_format, errors='coerce').notna().sum()
+        if matches > best_matches:
+            best_format, best_matches = date_format, matches
+            if matches == len(sample):
+                break
+    return best_format
+
+
+def _parse_date_strings(text):
+    """Parse date strings with the column's inferred format, falling back to pandas' parser"""
+    text = text.astype(str).str.strip()
+    date_format = infer_date_format(text)
+    parsed = pd.to_datetime(text, format=date_format, errors='coerce') if date_format else \
+        pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+
+    # Only cells that break the inferred format go through the slow parser
+    unmatched = parsed.isna()
+    if unmatched.any():
+        parsed[unmatched] = pd.to_datetime(text[unmatched], errors='coerce')
+    return parsed
+
+
+def normalize_date_column(values):
+    """
+    Convert a column of dates in one vectorized pass
+
+    The format is inferred once for the whole column; cells that do not
+    match it fall back to pandas' own parser, and whatever is still
+    unparseable is returned instead of raising. Only datetime and text cells
+    are dates: numbers (20240115 read from CSV, an unformatted Excel serial)
+    are invalid rather than read as nanoseconds since the epoch.
+
+    Args:
+        values: Series of raw cell values (strings, datetimes or blanks)
+
+    Returns:
+        Tuple of (datetime64 Series, Series of the invalid raw values)
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, values.iloc[:0]
+
+    present = values.notna()
+    if values.dtype == object:
+        present &= values.astype(str).str.strip() != ''
+
+    cells = values[present]
+    converted = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    inferred = pd.api.types.infer_dtype(cells, skipna=True)
+    if inferred in ('datetime', 'datetime64', 'date'):
+        converted[present] = pd.to_datetime(cells, errors='coerce')
+    elif inferred == 'string':
+        converted[present] = _parse_date_strings(cells)
+    elif values.dtype == object:
+        # Mixed cells: datetimes and text are parsed, anything else stays invalid
+        is_datetime = cells.map(lambda value: isinstance(value, (datetime, date, np.datetime64)))
+        is_text = cells.map(lambda value: isinstance(value, str))
+        if is_datetime.any():
+            converted[cells.index[is_datetime]] = pd.to_datetime(cells[is_datetime], errors='coerce')
+        if is_text.any():
+            converted[cells.index[is_text]] = _parse_date_strings(cells[is_text])
+
+    invalid = values[present & converted.isna()]
+    return converted, invalid
+
+
+def normalize_int_column(values):
+    """
+    Convert a column of integer IDs, returning the cells that are not integers
+
+    Blank cells become NA (no ID, or no parent row). Any other cell must be an
+    integral number, as a number or as text: non-numeric and fractional values
+    are returned as invalid rather than coerced to NA, which would insert the
+    row with a new ID or without its parent.
+
+    Args:
+        values: Series of raw cell values
+
+    Returns:
+        Tuple of (Int64 Series, Series of the invalid raw values)
+    """
+    if pd.api.types.is_integer_dtype(values):
+        return values.astype('Int64'), values.iloc[:0]
+
+    present = values.notna()
+    if values.dtype == object:
+        present &= values.astype(str).str.strip() != ''
+
+    cells = values[present]
+    numbers = pd.to_numeric(cells.astype(str).str.strip() if values.dtype == object else cells, errors='coerce')
+    numbers = numbers.astype('float64')
+    valid = np.isfinite(numbers) & (numbers % 1 == 0) & (numbers.abs() < 2 ** 63)
+
+    converted = pd.Series(pd.NA, index=values.index, dtype='Int64')
+    converted[numbers.index[valid]] = numbers[valid].astype('int64')
+    return converted, cells[~valid]
+
+
+def compute_row_hashes(frame):
+    """
+    Hash every row of a prepared DataFrame in one vectorized pass
+
+    The hash covers the values and dtypes of the columns, which
+    prepare_table_frame fixes per column kind.
+
+    Args:
+        frame: Prepared DataFrame holding the content columns of a table
+
+    Returns:
+        Series of signed 64-bit hashes, suitable for a BigInteger column
+    """
+    hashes = pd.util.hash_pandas_object(frame, index=False)
+    return pd.Series(hashes.to_numpy().view('int64'), index=frame.index)
+
+
+def _convert_text_column(values):
+    """
+    Convert a raw sheet column to strings, with None for blank cells
+
+    Numbers read from a workbook become the same strings as when read from
+    CSV: integral floats (a numeric column with blanks) lose their '.0'.
+    """
+    present = values.notna()
+    text = pd.Series(np.full(len(values), None, dtype=object), index=values.index)
+    if pd.api.types.is_integer_dtype(values):
+        text[present] = values[present].astype('int64').astype(str)
+    elif pd.api.types.is_float_dtype(values):
+        numbers = values[present]
+        integral = np.isfinite(numbers) & (numbers % 1 == 0)
+        strings = numbers.astype(str)
+        strings[integral] = numbers[integral].astype('int64').astype(str)
+        text[present] = strings
+    else:
+        text[present] = values[present].astype(str)
+    return text
+
+
+def _convert_column(values, kind):
+    """
+    Convert a raw sheet column to the type expected by the database
+
+    Every kind maps to one fixed dtype (float64 or object strings), whatever
+    the reader inferred, so row hashes only depend on the content; dates and
+    integer IDs are validated by normalize_date_column and normalize_int_column.
+    """
+    if kind == 'float':
+        return pd.to_numeric(values, errors='coerce').astype('float64')
+    return _convert_text_column(values)
+
+
+def prepare_table_frame(table, df, sheet=None, invalid_cells=None):
+    """
+    Convert a sheet DataFrame into the column layout of a database table
+
+    Args:
+        table: Table key from TABLE_SPECS
+        df: DataFrame as read from the sheet
+        sheet: Sheet name, used when reporting invalid cells (optional)
+        invalid_cells: InvalidCellCollector for unparseable dates and IDs (optional)
+
+    Returns:
+        DataFrame with one column per database column, converted column-wise;
+        rows with unparseable dates or IDs are dropped
+    """
+    spec = TABLE_SPECS[table]
+    prepared = pd.DataFrame(index=df.index)
+    valid_rows = pd.Series(True, index=df.index)
+
+    for column, (sources, kind, default) in spec['columns'].items():
+        source = next((name for name in sources if name in df.columns), None)
+        if source is None:
+            values = pd.Series(default, index=df.index, dtype=object)
+        else:
+            values = df[source]
+
+        if kind in ('date', 'int'):
+            normalize = normalize_date_column if kind == 'date' else normalize_int_column
+            prepared[column], invalid = normalize(values)
+            if not invalid.empty:
+                valid_rows[invalid.index] = False
+                if invalid_cells is not None:
+                    invalid_cells.add(sheet or table, source, invalid)
+        else:
+            prepared[column] = _convert_column(values, kind)
+
+    prepared = prepared[valid_rows]
+
+    # Content hash of the row as imported, before defaults such as 'now' are filled in
+    prepared['row_hash'] = compute_row_hashes(prepared.drop(columns=['id']))
+
+    # Fill columns that may not be NULL in the database
+    for column, fill_value in spec['required'].items():
+        if fill_value == 'now':
+            fill_value = pd.Timestamp(datetime.now())
+        prepared[column] = prepared[column].fillna(fill_value)
+
+    return prepared
+
+
+def _frame_to_records(frame):
+    """Turn a prepared DataFrame into a list of dicts with plain Python values"""
+    columns = {}
+    for column in frame.columns:
+        series = frame[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = pd.Series(series.dt.to_pydatetime(), index=series.index, dtype=object)
+        else:
+            values = series.astype(object)
+        columns[column] = values.where(series.notna(), None)
+    return pd.DataFrame(columns, index=frame.index).to_dict('records')
+
+
+def _id_batches(ids, batch_size=ID_LOOKUP_BATCH_SIZE):
+    """Split a Series of IDs into lists of distinct plain ints for IN lookups"""
+    ids = [int(value) for value in pd.unique(ids)]
+    return [ids[start:start + batch_size] for start in range(0, len(ids), batch_size)]
+
+
+def fetch_existing_ids(model, ids):
+    """
+    Fetch the subset of IDs that already exist in a table
+
+    Only the candidate IDs are looked up, in batches of ID_LOOKUP_BATCH_SIZE,
+    so sparse or external IDs never pull in the rows between them.
+
+    Args:
+        model: SQLAlchemy model class
+        ids: Series of candidate integer IDs (non-null)
+
+    Returns:
+        Set of IDs already present in the table
+    """
+    existing = set()
+    for batch in _id_batches(ids):
+        existing.update(db.session.execute(select(model.id).where(model.id.in_(batch))).scalars())
+    return existing
+
+
+def fetch_existing_hashes(model, ids):
+    """
+    Fetch the stored row hashes for the subset of IDs that exist
+
+    Only the candidate IDs are looked up, in batches of ID_LOOKUP_BATCH_SIZE.
+
+    Args:
+        model: SQLAlchemy model class
+        ids: Series of candidate integer IDs (non-null)
+
+    Returns:
+        Dictionary mapping existing IDs to their row hash (None if never hashed)
+    """
+    hashes = {}
+    for batch in _id_batches(ids):
+        hashes.update(db.session.execute(select(model.id, model.row_hash).where(model.id.in_(batch))).all())
+    return hashes
+
+
+def fetch_account_ids(model, ids):
+    """
+    Fetch the distinct account IDs currently stored for a set of row IDs
+
+    Read before an update, this gives the accounts the rows belonged to, so
+    a row moved to another account is also removed from its old account.
+
+    Args:
+        model: SQLAlchemy model class with an account_id column
+        ids: Series of existing integer IDs (non-null)
+
+    Returns:
+        Set of account IDs
+    """
+    account_ids = set()
+    for batch in _id_batches(ids):
+        account_ids.update(db.session.execute(
+            select(model.account_id).where(model.id.in_(batch)).distinct()).scalars())
+    return account_ids
+
+
+def update_records(model, records, batch_size=INSERT_BATCH_SIZE):
+    """
+    Update rows by ID with batched executemany calls
+
+    Args:
+        model: SQLAlchemy model class
+        records: List of dicts keyed by column name, each including 'id'
+        batch_size: Number of rows per batch
+    """
+    if not records:
+        return
+
+    table = model.__table__
+    columns = [column for column in records[0] if column != 'id']
+    stmt = table.update() \
+        .where(table.c.id == bindparam('_id')) \
+        .values({column: bindparam(column) for column in columns})
+
+    for start in range(0, len(records), batch_size):
+        batch = [
+            dict({column: record[column] for column in columns}, _id=record['id'])
+            for record in records[start:start + batch_size]
+        ]
+        db.session.execute(stmt, batch)
+
+
+def insert_records(model, records, batch_size=INSERT_BATCH_SIZE):
+    """
+    Insert records into a table with batched executemany calls
+
+    Args:
+        model: SQLAlchemy model class
+        records: List of dicts keyed by column name
+        batch_size: Number of rows per batch
+    """
+    table = model.__table__
+    for start in range(0, len(records), batch_size):
+        db.session.execute(table.insert(), records[start:start + batch_size])
+
+
+def import_dataframe(table, df, import_count, sheet=None, invalid_cells=None, delta=False, touched_accounts=None):
+    """
+    Import the rows of a sheet that do not yet exist in the database
+
+    Args:
+        table: Table key from TABLE_SPECS
+        df: DataFrame as read from the sheet
+        import_count: Dictionary of per-table counts, updated in place; in
+            delta mode its 'updated' entry counts updated rows per table
+        sheet: Sheet name, used when reporting invalid cells (optional)
+        invalid_cells: InvalidCellCollector for unparseable dates and IDs (optional)
+        delta: Also update existing rows whose content hash has changed
+        touched_accounts: Set that collects the IDs of accounts whose
+            performance rows were inserted or updated, including the accounts
+            updated rows were moved away from (optional)
+
+    Returns:
+        Number of rows inserted
+    """
+    if df.empty:
+        return 0
+
+    model = TABLE_SPECS[table]['model']
+    prepared = prepare_table_frame(table, df, sheet, invalid_cells)
+
+    # Rows without an ID get one from the database
+    has_id = prepared['id'].notna()
+    keyed = prepared[has_id].drop_duplicates(subset='id', keep='first')
+    unkeyed = prepared[~has_id].drop(columns=['id'])
+
+    if delta:
+        existing_hashes = fetch_existing_hashes(model, keyed['id'])
+        existing = pd.Series(list(existing_hashes.values()), index=list(existing_hashes.keys()), dtype='Int64')
+        exists = keyed['id'].isin(existing.index)
+        stored = pd.Series(existing.reindex(keyed['id'].astype('int64')).to_numpy(), index=keyed.index, dtype='Int64')
+
+        # Only rows whose content differs from what was last imported are written
+        changed = keyed[exists & (stored != keyed['row_hash']).fillna(True)]
+        if table == 'performance' and not changed.empty:
+            # Accounts the changed rows belong to before and after the update
+            updated_accounts = fetch_account_ids(model, changed['id'])
+            updated_accounts.update(int(account_id) for account_id in changed['account_id'].dropna().unique())
+        else:
+            updated_accounts = set()
+        update_records(model, _frame_to_records(changed))
+        updated = import_count.setdefault('updated', {table: 0 for table in TABLE_ORDER})
+        updated[table] += len(changed)
+
+        keyed = keyed[~exists]
+    else:
+        existing_ids = fetch_existing_ids(model, keyed['id'])
+        if existing_ids:
+            keyed = keyed[~keyed['id'].isin(existing_ids)]
+
+    inserted = 0
+    for frame in (keyed, unkeyed):
+        if not frame.empty:
+            insert_records(model, _frame_to_records(frame))
+            inserted += len(frame)
+
+    import_count[table] += inserted
+
+    if table == 'performance':
+        # Running aggregates absorb the new rows; modified accounts are recomputed
+        inserted_df = pd.concat([keyed, unkeyed])
+        update_account_stats(inserted_df, updated_accounts if delta else None)
+        accounts = {int(account_id) for account_id in inserted_df['account_id'].dropna().unique()}
+        if delta:
+            accounts.update(updated_accounts)
+        if touched_accounts is not None:
+            touched_accounts.update(accounts)
+
+        # Cached calculations are keyed by the version of their account; snapshots
+        # of the accounts this chunk left alone move to the new global version
+        if inserted or (delta and len(changed)):
+            bump_account_versions(accounts)
+            version = get_data_version('performance')
+            bump_data_version('performance')
+            carry_forward_snapshots(version, version + 1, accounts)
+
+    return inserted
+
+
+def _import_parsed_sheets(filepath, import_count, invalid_cells, progress=None, delta=False, touched_accounts=None):
+    """Parse all importable sheets in worker processes, then write them in FK-safe order"""
+    sheet_tables = {sheet: table_for_sheet(sheet) for sheet in get_excel_sheet_names(filepath)}
+    sheet_tables = {sheet: table for sheet, table in sheet_tables.items() if table is not None}
+    parsed = read_sheets_parallel(filepath, list(sheet_tables))
+
+    for table in TABLE_ORDER:
+        for sheet, sheet_table in sheet_tables.items():
+            if sheet_table != table:
+                continue
+            positions, columns = parsed[sheet]
+            df = pd.DataFrame(columns, index=pd.Index(positions))
+            import_dataframe(table, df, import_count, sheet, invalid_cells, delta, touched_accounts)
+            if progress:
+                progress(sheet, len(df))
+
+
+def run_excel_import(filepath, progress=None, parallel=False, delta=False, touched_accounts=None):
+    """
+    Import every recognised sheet of a workbook and commit the result
+
+    Args:
+        filepath: Path to the uploaded Excel file
+        progress: Optional callback called as progress(sheet, rows) after each chunk
+        parallel: Parse sheets in parallel worker processes instead of streaming
+            them; faster on multi-core machines but holds whole sheets in memory
+        delta: Update existing rows whose content changed instead of skipping them
+        touched_accounts: Set that collects the IDs of accounts whose
+            performance rows were inserted or updated (optional)
+
+    Returns:
+        Dictionary with the number of rows imported per table
+
+    Raises:
+        ImportDataError: If any date or ID cell could not be parsed; nothing is committed
+    """
+    import_count = new_import_count()
+    invalid_cells = InvalidCellCollector()
+
+    try:
+        if parallel:
+            _import_parsed_sheets(filepath, import_count, invalid_cells, progress, delta, touched_accounts)
+        else:
+            # Stream the recognised sheets from a single open workbook, one chunk
+            # at a time, in FK-safe order whatever their order in the workbook
+            sheet_tables = {}
+
+            def select_sheets(sheet_names):
+                """Map the workbook's sheets to tables and return the importable ones in FK-safe order"""
+                for sheet in sheet_names:
+                    table = table_for_sheet(sheet)
+                    if table is not None:
+                        sheet_tables[sheet] = table
+                return sorted(sheet_tables, key=lambda sheet: TABLE_ORDER.index(sheet_tables[sheet]))
+
+            for sheet, chunk in iter_excel_chunks(filepath, sheet_names=select_sheets):
+                table = sheet_tables[sheet]
+                import_dataframe(table, chunk, import_count, sheet, invalid_cells, delta, touched_accounts)
+                if progress:
+                    progress(sheet, len(chunk))
+
+        # Report every unparseable cell at once rather than stopping at the first
+        invalid_cells.raise_if_any()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return import_count
+
+
+def stream_digest(stream, block_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a binary stream, read in blocks from its current position"""
+    digest = hashlib.sha256()
+    for block in iter(lambda: stream.read(block_size), b''):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def file_digest(filepath):
+    """Return the SHA-256 hex digest of a file"""
+    with open(filepath, 'rb') as f:
+        return stream_digest(f)
+
+
+def find_imported_file(digest, target):
+    """
+    Look up a previous successful import of identical file contents
+
+    A delta import only counts while no delta import of other contents has
+    run since, as that one may have overwritten the rows it set.
+
+    Args:
+        digest: SHA-256 hex digest of the uploaded file
+        target: What the file is imported as, see ImportedFile.target
+
+    Returns:
+        ImportedFile, or None if these contents were never imported or must be imported again
+    """
+    imported = ImportedFile.query.filter_by(file_digest=digest, target=target).first()
+    if imported is not None and target.endswith(DELTA_TARGET_SUFFIX):
+        newer = ImportedFile.query.filter(ImportedFile.target.endswith(DELTA_TARGET_SUFFIX),
+                                          ImportedFile.imported_at > imported.imported_at).first()
+        if newer is not None:
+            return None
+    return imported
+
+
+def record_imported_file(digest, target, filename, import_count):
+    """Store or refresh the result of a successful import under the file digest"""
+    imported = ImportedFile.query.filter_by(file_digest=digest, target=target).first() \
+        or ImportedFile(file_digest=digest, target=target)
+    imported.filename = filename
+    imported.import_count = json.dumps(import_count)
+    imported.imported_at = datetime.utcnow()
+    db.session.add(imported)
+    db.session.commit()
+    return imported
+
+
+def remember_import(import_func, digest, target, filename):
+    """
+    Wrap an import function so that a successful run is recorded for its file digest
+
+    Args:
+        import_func: Import function called as import_func(filepath, progress=callback, **options)
+        digest: SHA-256 hex digest of the uploaded file
+        target: What the file is imported as, see ImportedFile.target
+        filename: Original name of the uploaded file
+
+    Returns:
+        Function with the same signature as import_func
+    """
+    def run(filepath, progress=None, **options):
+        import_count = import_func(filepath, progress=progress, **options)
+        record_imported_file(digest, target, filename, import_count)
+        return import_count
+    return run
+
+
+def run_csv_import(filepath, table, progress=None, chunk_size=CSV_CHUNK_SIZE, delta=False, touched_accounts=None):
+    """
+    Import a CSV file into one table, committing chunk by chunk
+
+    Every chunk is committed together with an ImportCheckpoint row keyed by
+    the file's digest, so re-running the same file after a failure seeks to
+    the byte offset after the last committed chunk instead of starting from zero.
+
+    Args:
+        filepath: Path to the uploaded CSV file
+        table: Table key from TABLE_SPECS the rows belong to
+        progress: Optional callback called as progress(sheet, rows) after each chunk
+        chunk_size: Number of rows per committed chunk
+        delta: Update existing rows whose content changed instead of skipping them
+        touched_accounts: Set that collects the IDs of accounts whose
+            performance rows were inserted or updated (optional)
+
+    Returns:
+        Dictionary with the number of rows imported (and, in delta mode,
+        updated) per table, including rows committed by earlier attempts on
+        the same file
+
+    Raises:
+        ImportDataError: If a chunk has unparseable dates or IDs; earlier chunks stay committed
+    """
+    filename = os.path.basename(filepath)
+    digest = file_digest(filepath)
+
+    checkpoint = ImportCheckpoint.query.filter_by(file_digest=digest, table_name=table) \
+        .order_by(ImportCheckpoint.id.desc()).first()
+    # Checkpoints written before byte offsets were recorded cannot be resumed
+    if not checkpoint or checkpoint.status == 'Completed' or checkpoint.byte_offset is None:
+        checkpoint = ImportCheckpoint(file_digest=digest, table_name=table, filename=filename,
+                                      rows_committed=0, rows_inserted=0, rows_updated=0, chunks_committed=0,
+                                      byte_offset=0)
+        db.session.add(checkpoint)
+        db.session.commit()
+
+    import_count = new_import_count()
+    import_count[table] = checkpoint.rows_inserted
+    if delta:
+        import_count['updated'] = {name: 0 for name in TABLE_ORDER}
+        import_count['updated'][table] = checkpoint.rows_updated or 0
+
+    try:
+        chunks = iter_csv_chunks(filepath, chunk_size, start_offset=checkpoint.byte_offset,
+                                 start_row=checkpoint.rows_committed)
+        for chunk, offset in chunks:
+            invalid_cells = InvalidCellCollector()
+            import_dataframe(table, chunk, import_count, filename, invalid_cells, delta, touched_accounts)
+            invalid_cells.raise_if_any()
+
+            # The checkpoint moves forward in the same transaction as the chunk's rows
+            checkpoint.rows_committed += len(chunk)
+            checkpoint.byte_offset = offset
+            checkpoint.rows_inserted = import_count[table]
+            if delta:
+                checkpoint.rows_updated = import_count['updated'][table]
+            checkpoint.chunks_committed += 1
+            db.session.commit()
+
+            if progress:
+                progress(filename, len(chunk))
+
+        checkpoint.status = 'Completed'
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return import_count
+
+
+def run_parquet_import(filepath, table=None, progress=None, delta=False, touched_accounts=None):
+    """
+    Import a Parquet file or a zip archive of per-sheet Parquet files and commit the result
+
+    Archive members are mapped to tables by sheet name, like workbook sheets,
+    and written in FK-safe order.
+
+    Args:
+        filepath: Path to the uploaded .parquet file or .zip archive
+        table: Table key for a single .parquet file (optional, defaults to the file name)
+        progress: Optional callback called as progress(sheet, rows) after each chunk
+        delta: Update existing rows whose content changed instead of skipping them
+        touched_accounts: Set that collects the IDs of accounts whose
+            performance rows were inserted or updated (optional)
+
+    Returns:
+        Dictionary with the number of rows imported per table
+
+    Raises:
+        ImportDataError: If any date or ID cell could not be parsed; nothing is committed
+    """
+    import_count = new_import_count()
+    invalid_cells = InvalidCellCollector()
+
+    sheet_tables = {sheet: table or table_for_sheet(sheet) for sheet in get_parquet_sheet_names(filepath)}
+    sheet_tables = {sheet: sheet_table for sheet, sheet_table in sheet_tables.items() if sheet_table is not None}
+    sheets = sorted(sheet_tables, key=lambda sheet: TABLE_ORDER.index(sheet_tables[sheet]))
+
+    try:
+        for sheet, chunk in iter_parquet_chunks(filepath, sheet_names=sheets):
+            import_dataframe(sheet_tables[sheet], chunk, import_count, sheet, invalid_cells, delta, touched_accounts)
+            if progress:
+                progress(sheet, len(chunk))
+
+        invalid_cells.raise_if_any()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return import_count
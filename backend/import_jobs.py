@@ -0,0 +1,135 @@
+"""
+Background Import Jobs for Financial Advisor Platform
+
+This module runs uploaded file imports on a bounded in-process thread pool so
+the upload request can return right away, and keeps per-job progress that
+clients can poll.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Maximum number of imports running at the same time
+IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", 2))
+
+# Number of jobs kept in memory for polling before the oldest finished ones are dropped
+MAX_TRACKED_JOBS = 200
+
+_executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix="import-job")
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+class ImportJob:
+    """Progress and outcome of a single background import"""
+
+    def __init__(self, filename):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.status = 'queued'  # queued, running, completed, failed
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self.sheets = OrderedDict()
+        self.import_count = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._last_tick = time.monotonic()
+
+    def mark_running(self):
+        """Flag the job as started and reset the progress clock"""
+        with self._lock:
+            self.status = 'running'
+            self.started_at = datetime.utcnow()
+            self._last_tick = time.monotonic()
+
+    def record_progress(self, sheet, rows):
+        """Add processed rows for a sheet; used as the import progress callback"""
+        now = time.monotonic()
+        with self._lock:
+            # A sheet's clock starts when the previous chunk of the job finished
+            progress = self.sheets.setdefault(sheet, {'rows_processed': 0, 'started': self._last_tick, 'updated': now})
+            progress['rows_processed'] += rows
+            progress['updated'] = now
+            self._last_tick = now
+
+    def to_dict(self):
+        """Convert job state to dictionary for JSON serialization"""
+        with self._lock:
+            sheets = {}
+            for sheet, progress in self.sheets.items():
+                elapsed = progress['updated'] - progress['started']
+                sheets[sheet] = {
+                    'rows_processed': progress['rows_processed'],
+                    'rows_per_sec': round(progress['rows_processed'] / elapsed, 1) if elapsed > 0 else None
+                }
+
+            return {
+                'id': self.id,
+                'filename': self.filename,
+                'status': self.status,
+                'created_at': self.created_at.isoformat(),
+                'started_at': self.started_at.isoformat() if self.started_at else None,
+                'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+                'sheets': sheets,
+                'import_count': self.import_count,
+                'error': self.error
+            }
+
+
+def _prune_jobs():
+    """Drop the oldest finished jobs once more than MAX_TRACKED_JOBS are tracked"""
+    for job_id in list(_jobs):
+        if len(_jobs) <= MAX_TRACKED_JOBS:
+            break
+        if _jobs[job_id].status in ('completed', 'failed'):
+            del _jobs[job_id]
+
+
+def _run_job(app, job, import_func, filepath):
+    """Execute an import inside an application context and record the outcome"""
+    with app.app_context():
+        job.mark_running()
+        try:
+            job.import_count = import_func(filepath, progress=job.record_progress)
+            job.status = 'completed'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.utcnow()
+            if os.path.exists(filepath):
+                os.remove(filepath)
+
+
+def submit_import_job(app, import_func, filepath, filename):
+    """
+    Queue an import to run in the background worker pool
+
+    Args:
+        app: Flask application, used to push an app context in the worker
+        import_func: Import function called as import_func(filepath, progress=callback)
+        filepath: Path of the saved upload, removed once the job finishes
+        filename: Original name of the uploaded file
+
+    Returns:
+        The queued ImportJob
+    """
+    job = ImportJob(filename)
+    with _jobs_lock:
+        _jobs[job.id] = job
+        _prune_jobs()
+
+    _executor.submit(_run_job, app, job, import_func, filepath)
+    return job
+
+
+def get_import_job(job_id):
+    """Return the tracked ImportJob with the given ID, or None"""
+    with _jobs_lock:
+        return _jobs.get(job_id)
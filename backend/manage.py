@@ -0,0 +1,19 @@
+"""
+Command line entry point for the Flask commands of the backend
+
+The flask executable resolves this directory as the 'backend' package, which
+breaks the flat imports the modules use, so commands are run from here instead:
+
+    cd backend
+    python manage.py db upgrade
+    python manage.py rebuild-account-stats
+"""
+
+from flask.cli import FlaskGroup
+
+from app import app
+
+cli = FlaskGroup(create_app=lambda: app)
+
+if __name__ == '__main__':
+    cli()
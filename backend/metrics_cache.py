@@ -0,0 +1,180 @@
+"""
+Metrics Cache for Financial Advisor Platform
+
+This module keeps per-account calculation results in memory between requests.
+Entries are tagged with their account's performance data version, which
+imports bump for the accounts whose rows they insert or update, so a cached
+result is rebuilt as soon as the account's rows change while other accounts
+keep theirs. The cache is bounded and evicts the least recently used entries
+first.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from data_processor import ReturnIndex, process_account_performance, generate_performance_chart_data
+from queries import load_performance_df, get_data_version, bump_data_versions
+
+# Maximum number of cached results per process
+METRICS_CACHE_SIZE = int(os.environ.get("METRICS_CACHE_SIZE", 1024))
+
+
+class VersionedLRUCache:
+    """
+    Thread-safe LRU cache whose entries are tagged with the data version they were computed from
+
+    An entry read with another version is recomputed, so a change only
+    invalidates the entries of the data it touched. Values are shared between
+    callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize=METRICS_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, version, compute):
+        """
+        Return the cached value for a key, computing and storing it on a miss
+
+        Args:
+            key: Hashable cache key
+            version: Current version of the data the value is computed from
+            compute: Function without arguments that produces the value
+
+        Returns:
+            The cached or freshly computed value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.invalidations += 1
+            self.misses += 1
+
+        # Computed outside the lock so slow calculations do not block other requests;
+        # a value computed while the data changed is tagged old and recomputed on the next read
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self):
+        """Return size and hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+_cache = VersionedLRUCache()
+
+
+def account_version_name(account_id):
+    """Name of the data_versions row that tracks the performance rows of one account"""
+    return f'performance:{int(account_id)}'
+
+
+def get_account_version(account_id):
+    """Return the performance data version of one account"""
+    return get_data_version(account_version_name(account_id))
+
+
+def bump_account_versions(account_ids):
+    """
+    Invalidate the cached results of some accounts in the current transaction
+
+    Args:
+        account_ids: Iterable of account IDs whose performance rows changed
+    """
+    bump_data_versions(account_version_name(account_id) for account_id in account_ids)
+
+
+def get_account_metrics(account_id):
+    """
+    Return the performance metrics of an account, as process_account_performance computes them
+
+    Args:
+        account_id: Account ID
+
+    Returns:
+        Metrics dictionary, or None if the account has no performance data
+    """
+    def compute():
+        performance_df = load_performance_df(account_id)
+        return process_account_performance(performance_df) if not performance_df.empty else None
+
+    # Period windows are relative to today, so results are only reused within a day
+    return _cache.get_or_compute(('metrics', account_id, date.today()), get_account_version(account_id), compute)
+
+
+def get_account_chart_data(account_id, max_points=None):
+    """
+    Return the chart series of an account, as generate_performance_chart_data computes them
+
+    Args:
+        account_id: Account ID
+        max_points: Maximum number of points per series (optional)
+
+    Returns:
+        Chart data dictionary, or None if the account has no performance data
+    """
+    def compute():
+        performance_df = load_performance_df(account_id)
+        if performance_df.empty:
+            return None
+        return generate_performance_chart_data(performance_df, max_points=max_points)
+
+    return _cache.get_or_compute(('chart', account_id, max_points), get_account_version(account_id), compute)
+
+
+def get_return_index(account_id):
+    """
+    Return the cumulative return index of an account, building it on first use
+
+    Args:
+        account_id: Account ID
+
+    Returns:
+        ReturnIndex for the account's current performance rows
+    """
+    return _cache.get_or_compute(('returns', account_id), get_account_version(account_id),
+                                 lambda: ReturnIndex(load_performance_df(account_id)))
+
+
+def cache_stats():
+    """Return the counters of the metrics cache"""
+    return _cache.stats()
+
+
+def clear_metrics_cache():
+    """Drop every cached result"""
+    _cache.clear()
@@ -0,0 +1,326 @@
+"""
+Account Metrics Snapshots for Financial Advisor Platform
+
+This module persists the output of the performance metrics calculation per
+account and as-of date in the account_metrics table, and runs an in-process
+scheduler thread that refreshes the snapshots after imports and once a night.
+Every serving process has its own scheduler; the nightly run is claimed in
+the database, so only one of them refreshes the whole book.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, date, timedelta
+from sqlalchemy import select, update, func, and_
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from data_processor import process_performance_batch
+from models import AccountMetrics, Performance, DataVersion
+from queries import load_performance_df, get_data_version
+
+# Number of accounts whose history is loaded at once during a refresh
+REFRESH_BATCH_SIZE = 500
+
+# Local hour of the nightly refresh
+NIGHTLY_REFRESH_HOUR = int(os.environ.get("METRICS_REFRESH_HOUR", 2))
+
+# Snapshots older than this many days are removed by the nightly refresh
+SNAPSHOT_RETENTION_DAYS = int(os.environ.get("METRICS_RETENTION_DAYS", 30))
+
+# data_versions row holding the ordinal of the last day whose nightly refresh was claimed
+NIGHTLY_CLAIM_NAME = 'metrics_nightly'
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def refresh_account_metrics(account_ids=None, as_of=None, only_stale=True, batch_size=REFRESH_BATCH_SIZE):
+    """
+    Compute and store metrics snapshots, committing batch by batch
+
+    Args:
+        account_ids: Iterable of account IDs (optional, defaults to every
+            account with performance rows)
+        as_of: Snapshot date (optional, defaults to today)
+        only_stale: Skip accounts that already have a snapshot for as_of
+            computed from the current data version
+        batch_size: Number of accounts computed at once
+
+    Returns:
+        Number of snapshots written
+    """
+    as_of = as_of or date.today()
+    version = get_data_version('performance')
+
+    if account_ids is None:
+        account_ids = db.session.execute(select(Performance.account_id).distinct()).scalars().all()
+    account_ids = {int(account_id) for account_id in account_ids}
+
+    if only_stale and account_ids:
+        current = select(AccountMetrics.account_id).where(
+            AccountMetrics.as_of == as_of, AccountMetrics.data_version == version)
+        account_ids -= set(db.session.execute(current).scalars())
+
+    table = AccountMetrics.__table__
+    account_ids = sorted(account_ids)
+    as_of_time = datetime.combine(as_of, datetime.max.time()) if as_of != date.today() else datetime.now()
+
+    for start in range(0, len(account_ids), batch_size):
+        batch = account_ids[start:start + batch_size]
+        metrics = process_performance_batch(load_performance_df(batch), as_of=as_of_time)
+        now = datetime.utcnow()
+
+        db.session.execute(table.delete().where(table.c.account_id.in_(batch), table.c.as_of == as_of))
+        if metrics:
+            db.session.execute(table.insert(), [
+                {
+                    'account_id': account_id,
+                    'as_of': as_of,
+                    'metrics': json.dumps(account_metrics),
+                    'data_version': version,
+                    'computed_at': now
+                }
+                for account_id, account_metrics in metrics.items()
+            ])
+        db.session.commit()
+
+    return len(account_ids)
+
+
+def carry_forward_snapshots(old_version, new_version, changed_account_ids):
+    """
+    Move the snapshots of unchanged accounts to a new performance data version
+
+    Called in the transaction that bumps the version, so the snapshots of
+    accounts whose rows did not change are not reported as stale. Snapshots
+    of the changed accounts keep the old version and are refreshed.
+
+    Args:
+        old_version: Data version before the bump
+        new_version: Data version after the bump
+        changed_account_ids: Iterable of account IDs whose performance rows changed
+    """
+    table = AccountMetrics.__table__
+    db.session.execute(table.update().where(table.c.data_version == old_version).values(data_version=new_version))
+
+    # Changed accounts are set back in batches rather than excluded with a NOT IN of unbounded length
+    account_ids = sorted(int(account_id) for account_id in changed_account_ids)
+    for start in range(0, len(account_ids), REFRESH_BATCH_SIZE):
+        batch = account_ids[start:start + REFRESH_BATCH_SIZE]
+        db.session.execute(table.update()
+                           .where(table.c.data_version == new_version, table.c.account_id.in_(batch))
+                           .values(data_version=old_version))
+
+
+def prune_account_metrics(retention_days=SNAPSHOT_RETENTION_DAYS):
+    """Delete snapshots older than the retention period and return how many were removed"""
+    cutoff = date.today() - timedelta(days=retention_days)
+    result = db.session.execute(AccountMetrics.__table__.delete().where(AccountMetrics.as_of < cutoff))
+    db.session.commit()
+    return result.rowcount
+
+
+def claim_nightly_refresh(day=None):
+    """
+    Claim the nightly refresh of a day for this process
+
+    The claim is a conditional update of a data_versions row, so when several
+    processes reach the nightly run only the first one to commit gets it.
+
+    Args:
+        day: Day of the run (optional, defaults to today)
+
+    Returns:
+        True if the run was claimed, False if another process already has it
+    """
+    ordinal = (day or date.today()).toordinal()
+    try:
+        result = db.session.execute(
+            update(DataVersion)
+            .where(DataVersion.name == NIGHTLY_CLAIM_NAME, DataVersion.version < ordinal)
+            .values(version=ordinal, updated_at=datetime.utcnow())
+        )
+        claimed = result.rowcount > 0
+        if not claimed and db.session.get(DataVersion, NIGHTLY_CLAIM_NAME) is None:
+            db.session.add(DataVersion(name=NIGHTLY_CLAIM_NAME, version=ordinal))
+            db.session.flush()
+            claimed = True
+        db.session.commit()
+    except IntegrityError:
+        # Another process created the row first
+        db.session.rollback()
+        claimed = False
+    return claimed
+
+
+def get_metrics_snapshots(account_ids):
+    """
+    Load the latest snapshot of each account with a single query
+
+    Args:
+        account_ids: Iterable of account IDs
+
+    Returns:
+        Dictionary mapping account_id to a dictionary with 'metrics',
+        'as_of', 'computed_at' and 'stale' (computed from older data or
+        for an earlier day)
+    """
+    account_ids = [int(account_id) for account_id in account_ids]
+    if not account_ids:
+        return {}
+
+    latest = select(AccountMetrics.account_id, func.max(AccountMetrics.as_of).label('as_of')) \
+        .where(AccountMetrics.account_id.in_(account_ids)) \
+        .group_by(AccountMetrics.account_id) \
+        .subquery()
+    stmt = select(AccountMetrics.account_id, AccountMetrics.as_of, AccountMetrics.metrics,
+                  AccountMetrics.data_version, AccountMetrics.computed_at) \
+        .join(latest, and_(AccountMetrics.account_id == latest.c.account_id, AccountMetrics.as_of == latest.c.as_of))
+
+    version = get_data_version('performance')
+    today = date.today()
+    snapshots = {}
+    for account_id, as_of, metrics, data_version, computed_at in db.session.execute(stmt):
+        snapshots[account_id] = {
+            'metrics': json.loads(metrics),
+            'as_of': as_of,
+            'computed_at': computed_at,
+            'stale': as_of < today or data_version != version
+        }
+    return snapshots
+
+
+def latest_account_metrics(account_ids):
+    """
+    Return the metrics of many accounts, from snapshots where they exist
+
+    Accounts without a snapshot are computed live in one batch and queued
+    for a snapshot refresh.
+
+    Args:
+        account_ids: Iterable of account IDs
+
+    Returns:
+        Tuple of the metrics keyed by account ID, the snapshots used (as
+        returned by get_metrics_snapshots) and the number of accounts
+        computed live
+    """
+    account_ids = [int(account_id) for account_id in account_ids]
+    snapshots = get_metrics_snapshots(account_ids)
+    metrics = {account_id: snapshot['metrics'] for account_id, snapshot in snapshots.items()}
+    missing = [account_id for account_id in account_ids if account_id not in snapshots]
+    live = process_performance_batch(load_performance_df(missing)) if missing else {}
+    if live:
+        metrics.update(live)
+        schedule_metrics_refresh(live.keys())
+    return metrics, list(snapshots.values()), len(live)
+
+
+class MetricsRefreshScheduler:
+    """Background thread that refreshes metrics snapshots on request and every night"""
+
+    def __init__(self, app, refresh_hour=NIGHTLY_REFRESH_HOUR):
+        self.app = app
+        self.refresh_hour = refresh_hour
+        self.last_run = None
+        self.last_error = None
+        self._pending = set()
+        self._refresh_all = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-refresh", daemon=True)
+
+    def start(self):
+        """Start the scheduler thread"""
+        self._thread.start()
+
+    def request_refresh(self, account_ids=None):
+        """Queue a refresh of some accounts, or of all accounts when account_ids is None"""
+        with self._lock:
+            if account_ids is None:
+                self._refresh_all = True
+            else:
+                self._pending.update(int(account_id) for account_id in account_ids)
+        self._wake.set()
+
+    def _next_nightly_run(self):
+        """Next occurrence of the nightly refresh hour"""
+        now = datetime.now()
+        run_at = now.replace(hour=self.refresh_hour, minute=0, second=0, microsecond=0)
+        return run_at if run_at > now else run_at + timedelta(days=1)
+
+    def _run(self):
+        """Wait for refresh requests or the nightly run and refresh the snapshots"""
+        next_nightly = self._next_nightly_run()
+        while True:
+            self._wake.wait(max((next_nightly - datetime.now()).total_seconds(), 0))
+            self._wake.clear()
+
+            with self._lock:
+                refresh_all, pending = self._refresh_all, self._pending
+                self._refresh_all, self._pending = False, set()
+
+            nightly = datetime.now() >= next_nightly
+            if nightly:
+                next_nightly = self._next_nightly_run()
+            if not (nightly or refresh_all or pending):
+                continue
+
+            with self.app.app_context():
+                try:
+                    # Another serving process may already have claimed tonight's run
+                    nightly = nightly and claim_nightly_refresh()
+                    if nightly or refresh_all or pending:
+                        refresh_account_metrics(None if nightly or refresh_all else pending)
+                    if nightly:
+                        prune_account_metrics()
+                    self.last_error = None
+                except Exception as e:
+                    db.session.rollback()
+                    self.last_error = str(e)
+                finally:
+                    self.last_run = datetime.utcnow()
+                    db.session.remove()
+
+
+def start_metrics_scheduler(app):
+    """Start the process-wide metrics refresh scheduler once and return it"""
+    global _scheduler
+    # Concurrent first requests of a threaded server must not start two schedulers
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = MetricsRefreshScheduler(app)
+            _scheduler.start()
+    return _scheduler
+
+
+def schedule_metrics_refresh(account_ids=None):
+    """Ask the scheduler to refresh snapshots; a no-op when the scheduler is not running"""
+    if _scheduler is not None:
+        _scheduler.request_refresh(account_ids)
+
+
+def refresh_after_import(import_func):
+    """
+    Wrap an import function so that a successful run triggers a snapshot refresh
+
+    Only the accounts whose performance rows the import inserted or updated
+    are refreshed; the import carries the other snapshots forward to the new
+    data version.
+
+    Args:
+        import_func: Import function called as
+            import_func(filepath, progress=callback, touched_accounts=set)
+
+    Returns:
+        Function called as run(filepath, progress=callback)
+    """
+    def run(filepath, progress=None):
+        touched_accounts = set()
+        import_count = import_func(filepath, progress=progress, touched_accounts=touched_accounts)
+        if touched_accounts:
+            schedule_metrics_refresh(touched_accounts)
+        return import_count
+    return run
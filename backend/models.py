@@ -1,3 +1,5 @@
+import json
+import math
 from datetime import datetime
 #from backend.main import db
 from app import db
@@ -16,6 +18,7 @@ class Household(db.Model):
     risk_profile = db.Column(db.String(50))
     segment = db.Column(db.String(50))
     total_assets = db.Column(db.Float)
+    row_hash = db.Column(db.BigInteger)  # Content hash of the last imported version of the row
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -46,11 +49,12 @@ class Account(db.Model):
     __tablename__ = 'accounts'
     
     id = db.Column(db.Integer, primary_key=True)
-    household_id = db.Column(db.Integer, db.ForeignKey('households.id'), nullable=False)
+    household_id = db.Column(db.Integer, db.ForeignKey('households.id'), nullable=False, index=True)
     account_type = db.Column(db.String(50))
     opening_date = db.Column(db.DateTime)
     current_balance = db.Column(db.Float)
     currency = db.Column(db.String(10), default='USD')
+    row_hash = db.Column(db.BigInteger)  # Content hash of the last imported version of the row
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -88,7 +92,11 @@ class Activity(db.Model):
     type = db.Column(db.String(50))  # Deposit, Withdrawal, Buy, Sell, Dividend, etc.
     description = db.Column(db.String(255))
     amount = db.Column(db.Float)
+    row_hash = db.Column(db.BigInteger)  # Content hash of the last imported version of the row
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Serves per-account listings ordered by date with the id tie-breaker of the keyset pages
+    __table_args__ = (db.Index('ix_activities_account_id_date_id', 'account_id', 'date', 'id'),)
     
     # Relationship with account (many-to-one)
     account = db.relationship("Account", back_populates="activities")
@@ -117,7 +125,10 @@ class Performance(db.Model):
     return_pct = db.Column(db.Float)
     asset_type = db.Column(db.String(50))
     allocation_pct = db.Column(db.Float)
+    row_hash = db.Column(db.BigInteger)  # Content hash of the last imported version of the row
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_performance_account_id_date', 'account_id', 'date'),)
     
     # Relationship with account (many-to-one)
     account = db.relationship("Account", back_populates="performance_records")
@@ -141,8 +152,8 @@ class FinancialGoal(db.Model):
     __tablename__ = 'financial_goals'
 
     id = db.Column(db.Integer, primary_key=True)
-    household_id = db.Column(db.Integer, db.ForeignKey('households.id'), nullable=False)
-    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=True)  # Optional, can be for a specific account
+    household_id = db.Column(db.Integer, db.ForeignKey('households.id'), nullable=False, index=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=True, index=True)  # Optional, can be for a specific account
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     target_amount = db.Column(db.Float, nullable=False)
@@ -187,7 +198,7 @@ class GoalProgressUpdate(db.Model):
     __tablename__ = 'goal_progress_updates'
 
     id = db.Column(db.Integer, primary_key=True)
-    goal_id = db.Column(db.Integer, db.ForeignKey('financial_goals.id'), nullable=False)
+    goal_id = db.Column(db.Integer, db.ForeignKey('financial_goals.id'), nullable=False, index=True)
     date = db.Column(db.DateTime, default=datetime.utcnow)
     amount = db.Column(db.Float, nullable=False)  # Amount added or subtracted
     note = db.Column(db.Text)
@@ -206,3 +217,146 @@ class GoalProgressUpdate(db.Model):
             'note': self.note,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+
+class ImportCheckpoint(db.Model):
+    """Import Checkpoint model - tracks how far a chunked CSV import has been committed"""
+    __tablename__ = 'import_checkpoints'
+
+    id = db.Column(db.Integer, primary_key=True)
+    file_digest = db.Column(db.String(64), nullable=False, index=True)  # SHA-256 of the file contents
+    table_name = db.Column(db.String(50), nullable=False)
+    filename = db.Column(db.String(255))
+    rows_committed = db.Column(db.Integer, default=0)  # Data rows read and committed so far
+    rows_inserted = db.Column(db.Integer, default=0)  # Of those, rows that were new
+    rows_updated = db.Column(db.Integer, default=0)  # Of those, existing rows a delta import changed
+    chunks_committed = db.Column(db.Integer, default=0)
+    byte_offset = db.Column(db.BigInteger)  # File position after the last committed chunk
+    status = db.Column(db.String(20), default='In Progress')  # In Progress, Completed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert instance to dictionary for JSON serialization"""
+        return {
+            'id': self.id,
+            'file_digest': self.file_digest,
+            'table_name': self.table_name,
+            'filename': self.filename,
+            'rows_committed': self.rows_committed,
+            'rows_inserted': self.rows_inserted,
+            'rows_updated': self.rows_updated,
+            'chunks_committed': self.chunks_committed,
+            'byte_offset': self.byte_offset,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class ImportedFile(db.Model):
+    """Imported File model - remembers the content digest and result of each successful import"""
+    __tablename__ = 'imported_files'
+
+    id = db.Column(db.Integer, primary_key=True)
+    file_digest = db.Column(db.String(64), nullable=False)  # SHA-256 of the file contents
+    # What the file was imported as: 'workbook' for Excel files, 'csv:<table>' for CSV
+    # files, 'parquet' for a zip of per-sheet Parquet files, 'parquet:<table>' for a
+    # single Parquet file; delta imports append ':delta', e.g. 'csv:performance:delta'
+    target = db.Column(db.String(50), nullable=False)
+    filename = db.Column(db.String(255))
+    import_count = db.Column(db.Text)  # JSON encoded counts returned by the import
+    imported_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.UniqueConstraint('file_digest', 'target', name='uq_imported_files_digest_target'),)
+
+    def to_dict(self):
+        """Convert instance to dictionary for JSON serialization"""
+        return {
+            'id': self.id,
+            'file_digest': self.file_digest,
+            'target': self.target,
+            'filename': self.filename,
+            'import_count': json.loads(self.import_count) if self.import_count else None,
+            'imported_at': self.imported_at.isoformat() if self.imported_at else None
+        }
+
+
+class AccountStats(db.Model):
+    """Account Stats model - running aggregates over an account's performance history, updated on insert"""
+    __tablename__ = 'account_stats'
+
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), primary_key=True)
+    return_count = db.Column(db.Integer, nullable=False, default=0)
+    return_sum = db.Column(db.Float, nullable=False, default=0.0)
+    return_mean = db.Column(db.Float, nullable=False, default=0.0)
+    return_m2 = db.Column(db.Float, nullable=False, default=0.0)  # Welford sum of squared deviations
+    value_count = db.Column(db.Integer, nullable=False, default=0)
+    peak_value = db.Column(db.Float)
+    max_drawdown = db.Column(db.Float, nullable=False, default=0.0)  # Worst drawdown as a fraction (<= 0)
+    last_value_date = db.Column(db.DateTime)
+    latest_allocation_date = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def volatility(self):
+        """Sample standard deviation of returns, as pandas std() computes it"""
+        if self.return_count < 2:
+            return 0.0
+        return math.sqrt(max(self.return_m2, 0.0) / (self.return_count - 1))
+
+    def to_dict(self):
+        """Convert instance to dictionary for JSON serialization"""
+        return {
+            'account_id': self.account_id,
+            'return_count': self.return_count,
+            'return_sum': round(self.return_sum, 2),
+            'mean_return': round(self.return_mean, 4),
+            'volatility': round(self.volatility, 2),
+            'value_count': self.value_count,
+            'peak_value': self.peak_value,
+            'max_drawdown': round(self.max_drawdown * 100, 2) if self.value_count > 1 else 0.0,
+            'last_value_date': self.last_value_date.isoformat() if self.last_value_date else None,
+            'latest_allocation_date': self.latest_allocation_date.isoformat() if self.latest_allocation_date else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class AccountMetrics(db.Model):
+    """Account Metrics model - snapshot of an account's performance metrics as of a given date"""
+    __tablename__ = 'account_metrics'
+
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False, index=True)
+    as_of = db.Column(db.Date, nullable=False)
+    metrics = db.Column(db.Text, nullable=False)  # JSON encoded output of process_account_performance
+    data_version = db.Column(db.Integer, nullable=False, default=0)  # Performance data version it was computed from
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.UniqueConstraint('account_id', 'as_of', name='uq_account_metrics_account_as_of'),)
+
+    def to_dict(self):
+        """Convert instance to dictionary for JSON serialization"""
+        return {
+            'id': self.id,
+            'account_id': self.account_id,
+            'as_of': self.as_of.isoformat() if self.as_of else None,
+            'metrics': json.loads(self.metrics) if self.metrics else None,
+            'data_version': self.data_version,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
+
+class DataVersion(db.Model):
+    """Data Version model - counter bumped whenever the rows of a dataset change, used to invalidate caches"""
+    __tablename__ = 'data_versions'
+
+    name = db.Column(db.String(50), primary_key=True)  # Dataset name, e.g. 'performance' or 'performance:<account_id>'
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert instance to dictionary for JSON serialization"""
+        return {
+            'name': self.name,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,115 @@
+"""
+Goal Projections for Financial Advisor Platform
+
+This module picks the return history behind a financial goal (its linked
+account, or the household's combined accounts) and runs the Monte Carlo
+projection from data_processor on it.
+"""
+
+from datetime import datetime
+
+from app import db
+from data_processor import combine_account_series, estimate_return_assumptions, simulate_goal_projection
+from models import Account
+from queries import load_performance_df
+
+# Simulated paths per goal unless the request asks for another number
+DEFAULT_PROJECTION_PATHS = 5000
+
+# Seed used when the request does not provide one, so repeated calls agree
+DEFAULT_PROJECTION_SEED = 42
+
+
+def months_until(target_date, now=None):
+    """Whole months from now until a target date, 0 if it has passed"""
+    now = now or datetime.utcnow()
+    return max(0, round((target_date - now).days / 30.4375))
+
+
+def load_household_history(household_id):
+    """
+    Load the combined return history of all accounts of a household
+
+    Args:
+        household_id: Household ID
+
+    Returns:
+        DataFrame with date, value and return_pct columns (empty without data)
+    """
+    account_ids = [account_id for account_id, in
+                   db.session.query(Account.id).filter(Account.household_id == household_id)]
+    performance_df = load_performance_df(account_ids)
+    if performance_df.empty:
+        return performance_df
+    combined_df, _ = combine_account_series(performance_df)
+    return combined_df
+
+
+def goal_assumptions(goal, household_histories=None):
+    """
+    Estimate the return assumptions for a goal
+
+    The linked account's history is used when it has one; otherwise the
+    combined history of the household's accounts.
+
+    Args:
+        goal: FinancialGoal instance
+        household_histories: Dictionary caching household histories between
+            goals of the same household (optional)
+
+    Returns:
+        Dictionary from estimate_return_assumptions with a 'source' key of
+        'account', 'household' or 'default'
+    """
+    if goal.account_id:
+        performance_df = load_performance_df(goal.account_id)
+        if not performance_df.empty:
+            return dict(estimate_return_assumptions(performance_df), source='account')
+
+    histories = household_histories if household_histories is not None else {}
+    if goal.household_id not in histories:
+        histories[goal.household_id] = load_household_history(goal.household_id)
+    assumptions = estimate_return_assumptions(histories[goal.household_id])
+    return dict(assumptions, source='household' if assumptions['estimated'] else 'default')
+
+
+def project_goal(goal, paths=DEFAULT_PROJECTION_PATHS, seed=DEFAULT_PROJECTION_SEED,
+                 monthly_contribution=0.0, household_histories=None):
+    """
+    Run the Monte Carlo projection of a goal up to its target date
+
+    Args:
+        goal: FinancialGoal instance with a target_date
+        paths: Number of simulated paths (capped by the simulation)
+        seed: Random seed
+        monthly_contribution: Amount added at the start of every month
+        household_histories: Dictionary caching household histories (optional)
+
+    Returns:
+        Dictionary with the goal figures, the assumptions used and the projection
+    """
+    assumptions = goal_assumptions(goal, household_histories)
+    projection = simulate_goal_projection(
+        current_amount=goal.current_amount,
+        target_amount=goal.target_amount,
+        months=months_until(goal.target_date),
+        annual_return=assumptions['annual_return'],
+        annual_volatility=assumptions['annual_volatility'],
+        paths=paths,
+        seed=seed,
+        monthly_contribution=monthly_contribution
+    )
+
+    result = {
+        'goal_id': goal.id,
+        'household_id': goal.household_id,
+        'account_id': goal.account_id,
+        'name': goal.name,
+        'target_amount': goal.target_amount,
+        'current_amount': goal.current_amount,
+        'target_date': goal.target_date.isoformat(),
+        'monthly_contribution': monthly_contribution,
+        'assumptions': assumptions
+    }
+    result.update(projection)
+    return result
@@ -0,0 +1,257 @@
+"""
+Database Queries for Financial Advisor Platform
+
+This module holds column-level Core selects that feed the pandas processing
+functions directly, without building ORM objects for every row.
+"""
+
+import base64
+import json
+import pandas as pd
+from datetime import datetime
+from sqlalchemy import select, update, func, tuple_
+
+from app import db
+from models import Household, Activity, Performance, DataVersion
+from serializers import record_columns
+
+# Largest page a paginated list endpoint returns
+MAX_PAGE_SIZE = 1000
+
+# Number of dataset names bound per version update, under SQLite's default limit of 999 parameters
+VERSION_BATCH_SIZE = 900
+
+# Performance columns used by the metrics and chart calculations
+PERFORMANCE_COLUMNS = ['account_id', 'date', 'value', 'return_pct', 'asset_type', 'allocation_pct']
+
+
+def load_performance_df(account_ids=None):
+    """
+    Load performance rows for one or more accounts into a typed DataFrame
+
+    Args:
+        account_ids: Account ID or iterable of account IDs (optional,
+            defaults to every account)
+
+    Returns:
+        DataFrame with PERFORMANCE_COLUMNS, ordered by account and date
+    """
+    columns = [getattr(Performance, name) for name in PERFORMANCE_COLUMNS]
+    stmt = select(*columns).order_by(Performance.account_id, Performance.date)
+
+    if account_ids is not None:
+        if isinstance(account_ids, int):
+            account_ids = [account_ids]
+        stmt = stmt.where(Performance.account_id.in_(list(account_ids)))
+
+    rows = db.session.execute(stmt).all()
+    df = pd.DataFrame.from_records(rows, columns=PERFORMANCE_COLUMNS)
+    return df.astype({
+        'account_id': 'int64',
+        'date': 'datetime64[ns]',
+        'value': 'float64',
+        'return_pct': 'float64',
+        'allocation_pct': 'float64'
+    })
+
+
+def load_client_summary(segment=None, risk_profile=None):
+    """
+    Aggregate client count, AUM, average age and segment mix in the database
+
+    Returns the same figures as process_client_data without loading the
+    households: only one row of totals and one row per segment come back.
+
+    Args:
+        segment: Only include households in this segment (optional)
+        risk_profile: Only include households with this risk profile (optional)
+
+    Returns:
+        Dictionary with client_count, total_aum, avg_age and segment_distribution
+    """
+    filters = []
+    if segment:
+        filters.append(Household.segment == segment)
+    if risk_profile:
+        filters.append(Household.risk_profile == risk_profile)
+
+    totals = select(
+        func.count(Household.id),
+        func.coalesce(func.sum(Household.total_assets), 0.0),
+        func.avg(func.extract('epoch', Household.birth_date))
+    ).where(*filters)
+    client_count, total_aum, avg_birth_epoch = db.session.execute(totals).one()
+
+    # Average age from the average birth date, in years of 365.25 days
+    avg_age = 0
+    if avg_birth_epoch is not None:
+        avg_age = (datetime.now().timestamp() - float(avg_birth_epoch)) / (365.25 * 86400)
+
+    segment_counts = select(Household.segment, func.count(Household.id)) \
+        .where(Household.segment.isnot(None), *filters) \
+        .group_by(Household.segment) \
+        .order_by(func.count(Household.id).desc())
+    segment_counts = db.session.execute(segment_counts).all()
+    total_clients = sum(count for _, count in segment_counts)
+    segment_distribution = {segment_name: {"count": count, "percentage": (count/total_clients)*100}
+                            for segment_name, count in segment_counts}
+
+    return {
+        "client_count": client_count,
+        "total_aum": float(total_aum),
+        "avg_age": avg_age,
+        "segment_distribution": segment_distribution
+    }
+
+
+def get_data_version(name):
+    """
+    Return the current version counter of a dataset with a primary key lookup
+
+    Args:
+        name: Dataset name, e.g. 'performance'
+
+    Returns:
+        Integer version, 0 if the dataset was never changed
+    """
+    version = db.session.execute(select(DataVersion.version).where(DataVersion.name == name)).scalar()
+    return version or 0
+
+
+def bump_data_version(name):
+    """
+    Increment the version counter of a dataset in the current transaction
+
+    Args:
+        name: Dataset name, e.g. 'performance'
+    """
+    result = db.session.execute(
+        update(DataVersion)
+        .where(DataVersion.name == name)
+        .values(version=DataVersion.version + 1, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 0:
+        db.session.add(DataVersion(name=name, version=1))
+        db.session.flush()
+
+
+def bump_data_versions(names):
+    """
+    Increment the version counters of many datasets in the current transaction
+
+    Args:
+        names: Iterable of dataset names, e.g. 'performance:101'
+    """
+    names = sorted(set(names))
+    for start in range(0, len(names), VERSION_BATCH_SIZE):
+        batch = names[start:start + VERSION_BATCH_SIZE]
+        db.session.execute(
+            update(DataVersion)
+            .where(DataVersion.name.in_(batch))
+            .values(version=DataVersion.version + 1, updated_at=datetime.utcnow())
+        )
+        existing = set(db.session.execute(select(DataVersion.name).where(DataVersion.name.in_(batch))).scalars())
+        db.session.add_all(DataVersion(name=name, version=1) for name in batch if name not in existing)
+    db.session.flush()
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row of a page as an opaque cursor string"""
+    payload = json.dumps(values, separators=(',', ':'), default=lambda value: value.isoformat())
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, keys):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string from a previous page
+        keys: Dictionary of the keys the cursor must contain and their types
+
+    Returns:
+        Dictionary of the cursor values
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, dict) or any(not isinstance(values.get(key), kind) for key, kind in keys.items()):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _fetch_page(query, limit, cursor_of):
+    """Run a keyset query for one page and build the cursor of the next page"""
+    if limit is None:
+        return query.all(), None
+
+    # One extra row tells whether another page follows
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(cursor_of(rows[-1]))
+
+
+def page_households(limit=None, cursor=None):
+    """
+    Load household rows in ID order, one keyset page at a time
+
+    Rows hold the serializer's record columns rather than model instances.
+
+    Args:
+        limit: Page size (optional, all households when omitted)
+        cursor: Cursor of the previous page (optional)
+
+    Returns:
+        Tuple of the household rows and the cursor of the next page (None on the last page)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = db.session.query(*record_columns(Household)).order_by(Household.id)
+    if cursor:
+        query = query.filter(Household.id > decode_cursor(cursor, {'id': int})['id'])
+    return _fetch_page(query, limit, lambda household: {'id': household.id})
+
+
+def page_activities(account_id, limit=None, cursor=None, start=None, end=None, activity_type=None):
+    """
+    Load an account's activity rows newest first, one keyset page at a time
+
+    Pages continue strictly after the (date, id) of the previous page's last
+    row, so every page is an index range scan regardless of its depth. Rows
+    hold the serializer's record columns rather than model instances.
+
+    Args:
+        account_id: Account ID
+        limit: Page size (optional, all matching activities when omitted)
+        cursor: Cursor of the previous page (optional)
+        start: Only activities on or after this datetime (optional)
+        end: Only activities before this datetime (optional)
+        activity_type: Only activities of this type (optional)
+
+    Returns:
+        Tuple of the activity rows and the cursor of the next page (None on the last page)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = db.session.query(*record_columns(Activity)).filter(Activity.account_id == account_id) \
+        .order_by(Activity.date.desc(), Activity.id.desc())
+    if start is not None:
+        query = query.filter(Activity.date >= start)
+    if end is not None:
+        query = query.filter(Activity.date < end)
+    if activity_type:
+        query = query.filter(Activity.type == activity_type)
+    if cursor:
+        values = decode_cursor(cursor, {'date': str, 'id': int})
+        last_date = datetime.fromisoformat(values['date'])
+        query = query.filter(tuple_(Activity.date, Activity.id) < tuple_(last_date, values['id']))
+    return _fetch_page(query, limit, lambda activity: {'date': activity.date, 'id': activity.id})
@@ -0,0 +1,97 @@
+"""
+Query Plan Checks for Financial Advisor Platform
+
+This module runs EXPLAIN on the per-account and per-household queries the
+API issues most often and reports whether the planner uses the index meant
+to serve them. On PostgreSQL sequential scans are disabled for the check, so
+the result does not depend on how many rows the tables currently hold.
+"""
+
+from sqlalchemy import select, text
+
+from app import db
+from models import Account, Activity, Performance, FinancialGoal, GoalProgressUpdate
+from queries import PERFORMANCE_COLUMNS
+
+# Placeholder ID used in the checked queries; the plan does not depend on it
+SAMPLE_ID = 1
+
+
+def plan_checks():
+    """
+    Build the representative queries and the index each one should use
+
+    Returns:
+        List of (name, statement, index name) tuples
+    """
+    performance_columns = [getattr(Performance, name) for name in PERFORMANCE_COLUMNS]
+    return [
+        ('performance history of an account',
+         select(*performance_columns)
+         .where(Performance.account_id == SAMPLE_ID)
+         .order_by(Performance.account_id, Performance.date),
+         'ix_performance_account_id_date'),
+        ('activity page of an account',
+         select(Activity)
+         .where(Activity.account_id == SAMPLE_ID)
+         .order_by(Activity.date.desc(), Activity.id.desc())
+         .limit(51),
+         'ix_activities_account_id_date_id'),
+        ('accounts of a household',
+         select(Account).where(Account.household_id == SAMPLE_ID),
+         'ix_accounts_household_id'),
+        ('goals of a household',
+         select(FinancialGoal).where(FinancialGoal.household_id == SAMPLE_ID),
+         'ix_financial_goals_household_id'),
+        ('goals of an account',
+         select(FinancialGoal).where(FinancialGoal.account_id == SAMPLE_ID),
+         'ix_financial_goals_account_id'),
+        ('progress updates of a goal',
+         select(GoalProgressUpdate).where(GoalProgressUpdate.goal_id == SAMPLE_ID),
+         'ix_goal_progress_updates_goal_id')
+    ]
+
+
+def explain(statement):
+    """
+    Return the query plan of a statement as text
+
+    Args:
+        statement: SQLAlchemy select
+
+    Returns:
+        Plan lines joined with newlines
+    """
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql)).all()
+        return '\n'.join(str(row[-1]) for row in rows)
+
+    db.session.execute(text('SET LOCAL enable_seqscan = off'))
+    rows = db.session.execute(text('EXPLAIN ' + sql)).all()
+    return '\n'.join(str(row[0]) for row in rows)
+
+
+def check_query_plans():
+    """
+    Explain every representative query and check that its index is used
+
+    Returns:
+        List of dictionaries with 'name', 'index', 'used' and 'plan'
+    """
+    results = []
+    try:
+        for name, statement, index in plan_checks():
+            plan = explain(statement)
+            results.append({
+                'name': name,
+                'index': index,
+                'used': index in plan,
+                'plan': plan
+            })
+    finally:
+        # Drops the SET LOCAL planner setting with the transaction
+        db.session.rollback()
+    return results
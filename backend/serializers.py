@@ -0,0 +1,117 @@
+"""
+JSON Serialization for Financial Advisor Platform
+
+This module builds list responses from plain column rows instead of model
+instances. Rows become dictionaries with the same keys as the models'
+to_dict methods and are encoded with orjson, which writes datetimes in the
+isoformat() form itself. Without orjson the standard json module is used.
+"""
+
+import json
+import numpy as np
+from datetime import date, datetime
+from flask import current_app
+
+from app import db
+from models import Household, Account, Activity, Performance, FinancialGoal, GoalProgressUpdate
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Columns of each model's record, in to_dict order
+RECORD_FIELDS = {
+    Household: ('id', 'name', 'email', 'phone', 'birth_date', 'risk_profile', 'segment', 'total_assets',
+                'created_at', 'updated_at'),
+    Account: ('id', 'household_id', 'account_type', 'opening_date', 'current_balance', 'currency',
+              'created_at', 'updated_at'),
+    Activity: ('id', 'account_id', 'date', 'type', 'description', 'amount', 'created_at'),
+    Performance: ('id', 'account_id', 'date', 'value', 'return_pct', 'asset_type', 'allocation_pct', 'created_at'),
+    FinancialGoal: ('id', 'household_id', 'account_id', 'name', 'description', 'target_amount', 'current_amount',
+                    'start_date', 'target_date', 'category', 'status', 'priority', 'created_at', 'updated_at'),
+    GoalProgressUpdate: ('id', 'goal_id', 'date', 'amount', 'note', 'created_at')
+}
+
+
+def record_columns(model):
+    """Return the column attributes to select for a model's records"""
+    return [getattr(model, field) for field in RECORD_FIELDS[model]]
+
+
+def add_goal_fields(record, now):
+    """
+    Add the computed progress_percentage and days_remaining of FinancialGoal.to_dict
+
+    Args:
+        record: Goal record dictionary, changed in place
+        now: Current UTC datetime, shared by every goal of a response
+    """
+    target_amount = record['target_amount']
+    record['progress_percentage'] = round((record['current_amount'] / target_amount * 100), 2) \
+        if target_amount > 0 else 0
+    record['days_remaining'] = (record['target_date'] - now).days if record['target_date'] else None
+
+
+def to_records(model, rows):
+    """
+    Turn rows selected with record_columns into dictionaries shaped like to_dict
+
+    Args:
+        model: Model class the rows were selected from
+        rows: Iterable of rows with the columns of record_columns(model)
+
+    Returns:
+        List of dictionaries; datetimes are left for the encoder
+    """
+    fields = RECORD_FIELDS[model]
+    records = [dict(zip(fields, row)) for row in rows]
+    if model is FinancialGoal:
+        now = datetime.utcnow()
+        for record in records:
+            add_goal_fields(record, now)
+    return records
+
+
+def load_records(model, *criteria):
+    """
+    Select the record columns of matching rows and return them as records
+
+    Args:
+        model: Model class
+        *criteria: Filter expressions
+
+    Returns:
+        List of dictionaries from to_records
+    """
+    return to_records(model, db.session.query(*record_columns(model)).filter(*criteria).all())
+
+
+def _default(value):
+    """Encode dates and numpy scalars for the standard json module"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    """
+    Encode a payload as compact JSON with sorted keys, as jsonify does
+
+    Args:
+        payload: JSON-compatible value; datetimes, dates, numpy scalars and
+            integer dictionary keys are allowed
+
+    Returns:
+        Encoded JSON as bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_default, sort_keys=True, separators=(',', ':')).encode()
+
+
+def json_response(payload, status=200):
+    """Return a JSON response encoded with dumps"""
+    return current_app.response_class(dumps(payload) + b'\n', status=status, mimetype='application/json')
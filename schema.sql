@@ -12,6 +12,7 @@ CREATE TABLE households (
 	risk_profile VARCHAR(50), 
 	segment VARCHAR(50), 
 	total_assets DOUBLE PRECISION, 
+	row_hash BIGINT, 
 	created_at TIMESTAMP, 
 	updated_at TIMESTAMP, 
 	CONSTRAINT households_pkey PRIMARY KEY (id)
@@ -26,6 +27,7 @@ CREATE TABLE accounts (
 	opening_date TIMESTAMP, 
 	current_balance DOUBLE PRECISION, 
 	currency VARCHAR(10), 
+	row_hash BIGINT, 
 	created_at TIMESTAMP, 
 	updated_at TIMESTAMP, 
 	CONSTRAINT accounts_pkey PRIMARY KEY (id), 
@@ -41,6 +43,7 @@ CREATE TABLE activities (
 	type VARCHAR(50), 
 	description VARCHAR(255), 
 	amount DOUBLE PRECISION, 
+	row_hash BIGINT, 
 	created_at TIMESTAMP, 
 	CONSTRAINT activities_pkey PRIMARY KEY (id), 
 	CONSTRAINT activities_account_id_fkey FOREIGN KEY(account_id) REFERENCES accounts (id)
@@ -56,6 +59,7 @@ CREATE TABLE performance (
 	return_pct DOUBLE PRECISION, 
 	asset_type VARCHAR(50), 
 	allocation_pct DOUBLE PRECISION, 
+	row_hash BIGINT, 
 	created_at TIMESTAMP, 
 	CONSTRAINT performance_pkey PRIMARY KEY (id), 
 	CONSTRAINT performance_account_id_fkey FOREIGN KEY(account_id) REFERENCES accounts (id)
@@ -96,20 +100,103 @@ CREATE TABLE goal_progress_updates (
 	CONSTRAINT goal_progress_updates_goal_id_fkey FOREIGN KEY(goal_id) REFERENCES financial_goals (id)
 );
 
+-- Table: import_checkpoints
+
+CREATE TABLE import_checkpoints (
+	id INTEGER DEFAULT nextval('import_checkpoints_id_seq'::regclass) NOT NULL, 
+	file_digest VARCHAR(64) NOT NULL, 
+	table_name VARCHAR(50) NOT NULL, 
+	filename VARCHAR(255), 
+	rows_committed INTEGER, 
+	rows_inserted INTEGER, 
+	rows_updated INTEGER, 
+	chunks_committed INTEGER, 
+	byte_offset BIGINT, 
+	status VARCHAR(20), 
+	created_at TIMESTAMP, 
+	updated_at TIMESTAMP, 
+	CONSTRAINT import_checkpoints_pkey PRIMARY KEY (id)
+);
+
+-- Table: imported_files
+
+CREATE TABLE imported_files (
+	id INTEGER DEFAULT nextval('imported_files_id_seq'::regclass) NOT NULL, 
+	file_digest VARCHAR(64) NOT NULL, 
+	target VARCHAR(50) NOT NULL, 
+	filename VARCHAR(255), 
+	import_count TEXT, 
+	imported_at TIMESTAMP, 
+	CONSTRAINT imported_files_pkey PRIMARY KEY (id), 
+	CONSTRAINT uq_imported_files_digest_target UNIQUE (file_digest, target)
+);
+
+-- Table: data_versions
+
+CREATE TABLE data_versions (
+	name VARCHAR(50) NOT NULL, 
+	version INTEGER NOT NULL, 
+	updated_at TIMESTAMP, 
+	CONSTRAINT data_versions_pkey PRIMARY KEY (name)
+);
+
+-- Table: account_stats
+
+CREATE TABLE account_stats (
+	account_id INTEGER NOT NULL, 
+	return_count INTEGER NOT NULL, 
+	return_sum DOUBLE PRECISION NOT NULL, 
+	return_mean DOUBLE PRECISION NOT NULL, 
+	return_m2 DOUBLE PRECISION NOT NULL, 
+	value_count INTEGER NOT NULL, 
+	peak_value DOUBLE PRECISION, 
+	max_drawdown DOUBLE PRECISION NOT NULL, 
+	last_value_date TIMESTAMP, 
+	latest_allocation_date TIMESTAMP, 
+	updated_at TIMESTAMP, 
+	CONSTRAINT account_stats_pkey PRIMARY KEY (account_id), 
+	CONSTRAINT account_stats_account_id_fkey FOREIGN KEY(account_id) REFERENCES accounts (id)
+);
+
+-- Table: account_metrics
+
+CREATE TABLE account_metrics (
+	id INTEGER DEFAULT nextval('account_metrics_id_seq'::regclass) NOT NULL, 
+	account_id INTEGER NOT NULL, 
+	as_of DATE NOT NULL, 
+	metrics TEXT NOT NULL, 
+	data_version INTEGER NOT NULL, 
+	computed_at TIMESTAMP, 
+	CONSTRAINT account_metrics_pkey PRIMARY KEY (id), 
+	CONSTRAINT account_metrics_account_id_fkey FOREIGN KEY(account_id) REFERENCES accounts (id), 
+	CONSTRAINT uq_account_metrics_account_as_of UNIQUE (account_id, as_of)
+);
+
 
 -- Foreign Keys for accounts
 -- {'name': 'accounts_household_id_fkey', 'constrained_columns': ['household_id'], 'referred_schema': None, 'referred_table': 'households', 'referred_columns': ['id'], 'options': {}, 'comment': None}
+-- Indexes for accounts
+-- {'name': 'ix_accounts_household_id', 'unique': False, 'column_names': ['household_id'], 'include_columns': [], 'dialect_options': {}}
 
 -- Foreign Keys for activities
 -- {'name': 'activities_account_id_fkey', 'constrained_columns': ['account_id'], 'referred_schema': None, 'referred_table': 'accounts', 'referred_columns': ['id'], 'options': {}, 'comment': None}
+-- Indexes for activities
+-- {'name': 'ix_activities_account_id_date_id', 'unique': False, 'column_names': ['account_id', 'date', 'id'], 'include_columns': [], 'dialect_options': {}}
 
 -- Foreign Keys for performance
 -- {'name': 'performance_account_id_fkey', 'constrained_columns': ['account_id'], 'referred_schema': None, 'referred_table': 'accounts', 'referred_columns': ['id'], 'options': {}, 'comment': None}
+-- Indexes for performance
+-- {'name': 'ix_performance_account_id_date', 'unique': False, 'column_names': ['account_id', 'date'], 'include_columns': [], 'dialect_options': {}}
 
 -- Foreign Keys for financial_goals
 -- {'name': 'financial_goals_account_id_fkey', 'constrained_columns': ['account_id'], 'referred_schema': None, 'referred_table': 'accounts', 'referred_columns': ['id'], 'options': {}, 'comment': None}
 -- {'name': 'financial_goals_household_id_fkey', 'constrained_columns': ['household_id'], 'referred_schema': None, 'referred_table': 'households', 'referred_columns': ['id'], 'options': {}, 'comment': None}
+-- Indexes for financial_goals
+-- {'name': 'ix_financial_goals_account_id', 'unique': False, 'column_names': ['account_id'], 'include_columns': [], 'dialect_options': {}}
+-- {'name': 'ix_financial_goals_household_id', 'unique': False, 'column_names': ['household_id'], 'include_columns': [], 'dialect_options': {}}
 
 -- Foreign Keys for goal_progress_updates
 -- {'name': 'goal_progress_updates_goal_id_fkey', 'constrained_columns': ['goal_id'], 'referred_schema': None, 'referred_table': 'financial_goals', 'referred_columns': ['id'], 'options': {}, 'comment': None}
+-- Indexes for goal_progress_updates
+-- {'name': 'ix_goal_progress_updates_goal_id', 'unique': False, 'column_names': ['goal_id'], 'include_columns': [], 'dialect_options': {}}
 